@@ -35,7 +35,7 @@ from .features import DatabaseFeatures                  # isort:skip
 from .introspection import DatabaseIntrospection        # isort:skip
 from .operations import DatabaseOperations              # isort:skip
 from .schema import DatabaseSchemaEditor                # isort:skip
-from .utils import convert_unicode                      # isort:skip
+from .utils import convert_unicode, HealthCheck, LRUCache  # isort:skip
 
 DatabaseError = Database.DatabaseError
 IntegrityError = Database.IntegrityError   
@@ -123,6 +123,8 @@ class DatabaseWrapper(BaseDatabaseWrapper):
         self.creation = DatabaseCreation(self)
         self.introspection = DatabaseIntrospection(self)
         self.validation = BaseDatabaseValidation(self)    
+        self.health_check = HealthCheck()
+        self.query_cache = LRUCache(QUERY_CACHE_SIZE)
         
     def get_connection_params(self):        
         conn_params = self.settings_dict['OPTIONS'].copy()        
@@ -167,6 +169,17 @@ class DatabaseWrapper(BaseDatabaseWrapper):
                 del conn_params['empty_string_as_null']
             else:
                 raise ValueError("The empty_string_as_null must be of bool type")
+        if 'health_check_interval' in conn_params:
+            interval = conn_params.pop('health_check_interval')
+            if type(interval) not in (int, float) or interval < 0:
+                raise ValueError("The health_check_interval must be a non-negative number")
+            self.health_check.interval = interval
+        self.health_check.reset()
+        if 'query_cache_size' in conn_params:
+            size = conn_params.pop('query_cache_size')
+            if type(size) is not int or size < 0:
+                raise ValueError("The query_cache_size must be a non-negative integer")
+            self.query_cache.resize(size)
         return Database.connect(user = params['user'], 
                                 password = params['password'],
                                 host = params['host'],
@@ -183,15 +196,16 @@ class DatabaseWrapper(BaseDatabaseWrapper):
         
     def create_cursor(self, name=None):
         cursor = self.connection.cursor()
-        return CursorWrapper(cursor)   
+        return CursorWrapper(cursor, self)   
     
     def _set_autocommit(self, autocommit):
         with self.wrap_database_errors:
             self.connection.autoCommit = autocommit
             
     def is_usable(self):
-        "TODO"
-        return True
+        # Always probe after an error, a recent successful statement says
+        # nothing about the state of the session then.
+        return self.health_check.is_usable(self.connection, force=self.errors_occurred)
         
     @cached_property
     def dameng_full_version(self):
@@ -221,24 +235,43 @@ def _lazy_re_compile(regex, flags=0):
 FORMAT_QMARK_REGEX = _lazy_re_compile(r'(?<!%)%s')
 BYTES_FORMAT_QMARK_REGEX = _lazy_re_compile(b'(?<!%)%s')
 
+# Default number of translated queries cached per connection, see
+# CursorWrapper.convert_query.
+QUERY_CACHE_SIZE = 512
+
 class CursorWrapper(object):
         
     codes_for_integrityerror = (1048,)
 
-    def __init__(self, cursor):
+    def __init__(self, cursor, db=None):
         self.cursor = cursor
+        self.db = db
 
-    def convert_query(self, query):
+    def _translate_query(self, query):
         if isinstance(query, bytes):
             return BYTES_FORMAT_QMARK_REGEX.sub(b'?', query).replace(b'%%', b'%')
         else:
             return FORMAT_QMARK_REGEX.sub('?', query).replace('%%', '%')
 
+    def convert_query(self, query):
+        cache = self.db.query_cache if self.db is not None else None
+        if cache is None or not cache.maxsize:
+            return self._translate_query(query)
+
+        converted = cache.get(query)
+        if converted is None:
+            converted = self._translate_query(query)
+            cache.put(query, converted)
+        return converted
+
     def execute(self, query, args=None):
         try:
             # args is None means no string interpolation
             query = self.convert_query(query)
-            return self.cursor.execute(query, args)
+            result = self.cursor.execute(query, args)
+            if self.db is not None:
+                self.db.health_check.mark_used()
+            return result
         except Database.OperationalError as e:
             # Map some error codes to IntegrityError, since they seem to be
             # misclassified and Django would prefer the more logical place.
@@ -251,7 +284,10 @@ class CursorWrapper(object):
 
     def executemany(self, query, args):
         try:
-            return self.cursor.executemany(query, args)
+            result = self.cursor.executemany(query, args)
+            if self.db is not None:
+                self.db.health_check.mark_used()
+            return result
         except Database.OperationalError as e:
             # Map some error codes to IntegrityError, since they seem to be
             # misclassified and Django would prefer the more logical place.
@@ -17,31 +17,93 @@ class SQLInsertCompiler(compiler.SQLInsertCompiler, SQLCompiler):
         self.return_id = False
         super(SQLInsertCompiler, self).__init__(*args, **kwargs)
 
-    def fix_auto(self, sql, opts, fields, qn):
-        if opts.auto_field is not None and fields or not fields:
-            auto_field_column = opts.auto_field.db_column or opts.auto_field.column
-            columns = [f.column for f in fields]
-
-            if auto_field_column in columns and fields or not fields and auto_field_column:
-
-                table = qn(opts.db_table)
-                sql_format = 'SET IDENTITY_INSERT %s ON WITH REPLACE NULL; %s; SET IDENTITY_INSERT %s OFF;'
-                id_insert_sql = sql_format % (table, sql, table)
-
-                sql = id_insert_sql
-
-        return sql
+    def _identity_insert_table(self, fields):
+        """
+        Return the quoted table name if the statement supplies values for the
+        identity column, which DM only accepts under SET IDENTITY_INSERT.
+        """
+        opts = self.query.get_meta()
+        if opts.auto_field is None:
+            return None
+        auto_field_column = opts.auto_field.db_column or opts.auto_field.column
+        if fields and auto_field_column not in [f.column for f in fields]:
+            return None
+        return self.connection.ops.quote_name(opts.db_table)
+
+    def _returning(self):
+        if django.VERSION < (3, 0):
+            return self.return_id
+        return self.returning_fields
+
+    def _bulk_statements(self):
+        """
+        Yield the INSERT statements of a bulk insert without returning
+        columns. The rows are spread over as many statements as needed to
+        keep each one within features.max_query_params bound values, and
+        each statement is built only when the previous one has been used,
+        so a large load never holds more than one statement in memory.
+        """
+        fields = self.query.fields
+        if (self._returning() or not fields or len(self.query.objs) < 2 or
+                not self.connection.features.has_bulk_insert):
+            yield from super().as_sql()
+            return
+
+        qn = self.connection.ops.quote_name
+        head = 'INSERT INTO %s (%s) ' % (
+            qn(self.query.get_meta().db_table),
+            ', '.join(qn(f.column) for f in fields),
+        )
+        max_params = self.connection.features.max_query_params
+
+        placeholder_rows, param_rows = [], []
+        count = 0
+        for obj in self.query.objs:
+            value_row = [self.prepare_value(field, self.pre_save_val(field, obj)) for field in fields]
+            (placeholders,), (params,) = self.assemble_as_sql(fields, [value_row])
+            if placeholder_rows and count + len(params) > max_params:
+                yield self._bulk_statement(head, fields, placeholder_rows, param_rows)
+                placeholder_rows, param_rows = [], []
+                count = 0
+            placeholder_rows.append(placeholders)
+            param_rows.append(params)
+            count += len(params)
+        yield self._bulk_statement(head, fields, placeholder_rows, param_rows)
+
+    def _bulk_statement(self, head, fields, placeholder_rows, param_rows):
+        sql = head + self.connection.ops.bulk_insert_sql(fields, placeholder_rows)
+        return sql, tuple(p for ps in param_rows for p in ps)
+
+    def execute_sql(self, *args, **kwargs):
+        # return_id (Django < 3.0) or returning_fields (Django 3.0)
+        if (args and args[0]) or any(kwargs.values()):
+            return super(SQLInsertCompiler, self).execute_sql(*args, **kwargs)
+
+        table = self._identity_insert_table(self.query.fields)
+        with self.connection.cursor() as cursor:
+            # Switch IDENTITY_INSERT on once for the whole load, not once
+            # per statement.
+            if table is not None:
+                cursor.execute('SET IDENTITY_INSERT %s ON WITH REPLACE NULL' % table)
+            try:
+                for sql, params in self._bulk_statements():
+                    cursor.execute(sql, params)
+            finally:
+                if table is not None:
+                    cursor.execute('SET IDENTITY_INSERT %s OFF' % table)
+        if django.VERSION < (3, 0):
+            return None
+        return []
 
     def as_sql(self):
-        result = super().as_sql()
-        for sql, params in result:
-            opts = self.query.get_meta()
-
-            qn = self.connection.ops.quote_name
-
-            sql = self.fix_auto(sql, opts, self.query.fields, qn)
-
-        return [(sql, params),]
+        result = list(self._bulk_statements())
+        table = self._identity_insert_table(self.query.fields)
+        if table is not None and result:
+            sql, params = result[0]
+            result[0] = ('SET IDENTITY_INSERT %s ON WITH REPLACE NULL; %s' % (table, sql), params)
+            sql, params = result[-1]
+            result[-1] = ('%s; SET IDENTITY_INSERT %s OFF;' % (sql, table), params)
+        return result
 
     def field_as_sql(self, field, val):
         """
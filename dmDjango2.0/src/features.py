@@ -11,6 +11,10 @@ class DatabaseFeatures(BaseDatabaseFeatures):
     has_bulk_insert = True
     driver_supports_timedelta_args = True
     supports_paramstyle_pyformat = False
+
+    # Upper bound of the values bound by one statement, used to split bulk
+    # inserts over several statements.
+    max_query_params = 2 ** 16 - 1
     can_use_chunked_reads = True
     empty_fetchmany_value = []
     interprets_empty_strings_as_nulls = False
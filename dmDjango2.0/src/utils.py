@@ -1,4 +1,6 @@
 import datetime
+import time
+from collections import OrderedDict
 
 from django.utils.encoding import force_bytes, force_text
 
@@ -17,3 +19,129 @@ class InsertIdVar(object):
         param = cursor.cursor.var(Database.NUMBER)
         cursor._insert_id_var = param
         return param
+
+
+class HealthCheck(object):
+    """
+    Rate-limited liveness check of a connection. The probe is skipped when
+    the connection completed a statement less than ``interval`` seconds ago.
+    """
+
+    def __init__(self, interval=0):
+        self.interval = interval
+        self.last_used = None
+        self.probes = 0
+        self.skipped = 0
+        self.failures = 0
+
+    def mark_used(self):
+        self.last_used = time.monotonic()
+
+    def reset(self):
+        self.last_used = None
+
+    def ping(self, connection):
+        """
+        Use the driver-level liveness call when dmPython provides one, and
+        fall back to a round trip otherwise.
+        """
+        ping = getattr(connection, 'ping', None)
+        if ping is not None:
+            ping()
+            return
+        cursor = connection.cursor()
+        try:
+            cursor.execute('select 1 from dual')
+        finally:
+            cursor.close()
+
+    def is_usable(self, connection, force=False):
+        if (not force and self.interval and self.last_used is not None and
+                time.monotonic() - self.last_used < self.interval):
+            self.skipped += 1
+            return True
+
+        self.probes += 1
+        try:
+            self.ping(connection)
+        except Database.Error:
+            self.failures += 1
+            self.last_used = None
+            return False
+        self.mark_used()
+        return True
+
+    def stats(self):
+        return {
+            'interval': self.interval,
+            'probes': self.probes,
+            'skipped': self.skipped,
+            'failures': self.failures,
+        }
+
+
+class LRUCache(object):
+    """
+    A bounded mapping that discards the least recently used entry once it
+    holds more than ``maxsize`` entries. ``on_evict(key, value)`` is called
+    for every entry dropped by the cache.
+    """
+
+    def __init__(self, maxsize=128, on_evict=None):
+        self.maxsize = maxsize
+        self.on_evict = on_evict
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def pop(self, key, default=None):
+        return self._data.pop(key, default)
+
+    def put(self, key, value):
+        if key in self._data:
+            self._data.move_to_end(key)
+        self._data[key] = value
+        self._trim()
+
+    def resize(self, maxsize):
+        self.maxsize = maxsize
+        self._trim()
+
+    def _trim(self):
+        while len(self._data) > max(self.maxsize, 0):
+            key, value = self._data.popitem(last=False)
+            self.evictions += 1
+            if self.on_evict is not None:
+                self.on_evict(key, value)
+
+    def clear(self):
+        while self._data:
+            key, value = self._data.popitem(last=False)
+            if self.on_evict is not None:
+                self.on_evict(key, value)
+
+    def stats(self):
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
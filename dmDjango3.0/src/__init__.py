@@ -1,6 +1,12 @@
+from .lob import DMBlobStorage, LobReader, StreamingBinaryField, StreamingTextField, open_lob, write_lob
+from .ingest import ingest_vectors
+from .queryset import DMManager, DMQuerySet
 from .vector import VectorField, l1_distance, l2_distance, cosine_distance, hamming_distance,\
-    inner_product, inner_product_negative, IvfVectorIndex, HnswVectorIndex
+    inner_product, inner_product_negative, IvfVectorIndex, HnswVectorIndex, BuildDeferredVectorIndex,\
+    RebuildVectorIndex, build_pending_vector_indexes, pending_vector_indexes
 
 
-__all__ = ('VectorField', 'l1_distance', 'l2_distance', 'cosine_distance', 'hamming_distance',
-           'inner_product', 'inner_product_negative', 'IvfVectorIndex', 'HnswVectorIndex')
\ No newline at end of file
+__all__ = ('DMBlobStorage', 'LobReader', 'StreamingBinaryField', 'StreamingTextField', 'open_lob', 'write_lob',
+           'ingest_vectors', 'DMManager', 'DMQuerySet', 'VectorField', 'l1_distance', 'l2_distance', 'cosine_distance', 'hamming_distance',
+           'inner_product', 'inner_product_negative', 'IvfVectorIndex', 'HnswVectorIndex',
+           'BuildDeferredVectorIndex', 'RebuildVectorIndex', 'build_pending_vector_indexes', 'pending_vector_indexes')
\ No newline at end of file
@@ -5,6 +5,7 @@ from __future__ import unicode_literals
 
 import datetime
 import decimal
+import hashlib
 import os
 import platform
 import sys
@@ -34,13 +35,23 @@ from .creation import DatabaseCreation                  # isort:skip
 from .features import DatabaseFeatures                  # isort:skip
 from .introspection import DatabaseIntrospection        # isort:skip
 from .operations import DatabaseOperations              # isort:skip
+from .pool import PoolTimeout, get_pool                 # isort:skip
 from .schema import DatabaseSchemaEditor                # isort:skip
-from .utils import convert_unicode, InsertVar           # isort:skip
+from .utils import convert_unicode, FetchStats, HealthCheck, InsertVar, LRUCache, StatementCache  # isort:skip
 from .validation import DatabaseValidation              # isort:skip
 
 DatabaseError = Database.DatabaseError
 IntegrityError = Database.IntegrityError   
 
+def decimal_output_type_handler(cursor, name, default_type, size, precision, scale):
+    """
+    Let the driver build Decimal values for fractional DECIMAL columns instead
+    of leaving the conversion to DatabaseOperations.convert_decimalfield_value.
+    """
+    if scale and default_type is getattr(Database, 'DECIMAL', None):
+        return cursor.var(decimal.Decimal, arraysize=cursor.arraysize)
+
+
 class DatabaseWrapper(BaseDatabaseWrapper):
     vendor = 'Dameng'
     display_name = 'DM'
@@ -135,6 +146,20 @@ class DatabaseWrapper(BaseDatabaseWrapper):
         self.creation = DatabaseCreation(self)
         self.introspection = DatabaseIntrospection(self)
         self.validation = DatabaseValidation(self)    
+        self.pool = None
+        self.health_check = HealthCheck()
+        self.arraysize = None
+        # Fetch size hint of the query being executed, see
+        # SQLCompiler.execute_sql.
+        self.fetch_size = None
+        self.fetch_stats = FetchStats()
+        self.lob_prefetch_size = None
+        self.native_decimal = False
+        # Reads of LOB locators, in total and since the last execute().
+        self.lob_reads = 0
+        self.query_lob_reads = 0
+        self.query_cache = LRUCache(QUERY_CACHE_SIZE)
+        self.statement_cache = StatementCache(STATEMENT_CACHE_SIZE)
         
     def get_connection_params(self):        
         conn_params = self.settings_dict['OPTIONS'].copy()        
@@ -209,7 +234,49 @@ class DatabaseWrapper(BaseDatabaseWrapper):
                 del conn_params['empty_string_as_null']
             else:
                 raise ValueError("The empty_string_as_null must be of bool type")
-        try:
+
+        if 'health_check_interval' in conn_params:
+            interval = conn_params.pop('health_check_interval')
+            if type(interval) not in (int, float) or interval < 0:
+                raise ValueError("The health_check_interval must be a non-negative number")
+            self.health_check.interval = interval
+        self.health_check.reset()
+        if 'query_cache_size' in conn_params:
+            size = conn_params.pop('query_cache_size')
+            if type(size) is not int or size < 0:
+                raise ValueError("The query_cache_size must be a non-negative integer")
+            self.query_cache.resize(size)
+        if 'statement_cache_size' in conn_params:
+            size = conn_params.pop('statement_cache_size')
+            if type(size) is not int or size < 0:
+                raise ValueError("The statement_cache_size must be a non-negative integer")
+            self.statement_cache.resize(size)
+        if 'arraysize' in conn_params:
+            arraysize = conn_params.pop('arraysize')
+            if type(arraysize) is not int or arraysize < 1:
+                raise ValueError("The arraysize must be a positive integer")
+            self.arraysize = arraysize
+        if 'lob_prefetch_size' in conn_params:
+            size = conn_params.pop('lob_prefetch_size')
+            if type(size) is not int or size < 0:
+                raise ValueError("The lob_prefetch_size must be a non-negative integer")
+            self.lob_prefetch_size = size or None
+        if 'native_decimal' in conn_params:
+            if type(conn_params['native_decimal']) is not bool:
+                raise ValueError("The native_decimal must be of bool type")
+            self.native_decimal = conn_params.pop('native_decimal')
+        # Cursors prepared on a previous connection are useless now.
+        self.statement_cache.clear()
+
+        pool_options = conn_params.pop('pool', None)
+        if pool_options is True:
+            pool_options = {}
+        elif pool_options is False:
+            pool_options = None
+        elif pool_options is not None and not isinstance(pool_options, dict):
+            raise ValueError("The pool must be of bool or dict type")
+
+        def connect():
             return Database.connect(user = params['user'], 
                                 password = params['password'],
                                 host = params['host'],
@@ -219,18 +286,107 @@ class DatabaseWrapper(BaseDatabaseWrapper):
                                 ssl_pwd = params['ssl_pwd'],
                                 **conn_params
                                 )
+
+        try:
+            if pool_options is None:
+                self.pool = None
+                return connect()
+
+            # The settings identify the pool, but they hold the password:
+            # only a digest of them is kept.
+            key = hashlib.sha256(repr((
+                tuple(sorted(params.items())),
+                tuple(sorted((name, repr(value)) for name, value in conn_params.items())),
+            )).encode()).hexdigest()
+            name = '%s@%s:%s' % (params['user'], params['host'], params['port'])
+            self.pool = get_pool(key, connect, **dict({'name': name}, **pool_options))
+            return self.pool.acquire()
+        except PoolTimeout as e:
+            raise DatabaseError(str(e))
         except Database.DatabaseError as e:
             raise DatabaseError
         except Exception as e:
             raise
+
+    def _close(self):
+        # Prepared cursors belong to the session, release them before it
+        # is closed or handed to another thread through the pool.
+        self.statement_cache.clear()
+        if self.connection is not None and self.pool is not None:
+            # Hand the session back to the pool instead of closing it. A
+            # connection that raised errors may be broken, so drop it.
+            with self.wrap_database_errors:
+                return self.pool.release(self.connection, discard=self.errors_occurred)
+        return super(DatabaseWrapper, self)._close()
+
+    def pool_stats(self):
+        """
+        Return the stats of the connection pool used by this connection, or
+        None if pooling is disabled.
+        """
+        if self.pool is None:
+            return None
+        return self.pool.stats()
     
-    def init_connection_state(self):    
-        #do nothing
-        pass
+    def init_connection_state(self):
+        global _lob_prefetch_supported
+        if self.lob_prefetch_size is None:
+            return
+        if _lob_prefetch_supported is None:
+            _lob_prefetch_supported = self._check_lob_prefetch()
+            if not _lob_prefetch_supported:
+                warnings.warn(
+                    "The database driver ignores Cursor.setoutputsize(), "
+                    "OPTIONS['lob_prefetch_size'] has no effect.", RuntimeWarning,
+                )
+        if not _lob_prefetch_supported:
+            self.lob_prefetch_size = None
+
+    def _check_lob_prefetch(self):
+        """
+        Return whether the driver returns a LOB value shorter than
+        lob_prefetch_size inline after setoutputsize(), some dmPython
+        versions accept the call but still return a locator.
+        """
+        cursor = self._configure_cursor(self.connection.cursor())
+        try:
+            cursor.execute("SELECT CAST('x' AS CLOB) FROM DUAL")
+            value = cursor.fetchone()[0]
+        finally:
+            cursor.close()
+        return not isinstance(value, Database.LOB)
         
     def create_cursor(self, name=None):
-        cursor = self.connection.cursor()
-        return CursorWrapper(cursor)   
+        cursor = self._configure_cursor(self.connection.cursor())
+        return CursorWrapper(cursor, self, fetch_size=self.fetch_size)
+
+    def _configure_cursor(self, cursor):
+        """
+        Apply the fetch OPTIONS to a new driver cursor, including the
+        prepared cursors of the statement cache.
+        """
+        if self.arraysize is not None:
+            cursor.arraysize = self.arraysize
+        if self.lob_prefetch_size is not None and hasattr(cursor, 'setoutputsize'):
+            # LOB values up to this size come back inline with the row as
+            # str/bytes, larger ones as Database.LOB locators.
+            cursor.setoutputsize(self.lob_prefetch_size)
+        if self.native_decimal and hasattr(cursor, 'outputtypehandler'):
+            cursor.outputtypehandler = decimal_output_type_handler
+        return cursor
+
+    def chunked_cursor(self):
+        """
+        Return a cursor streaming its result for QuerySet.iterator(), each
+        fetchmany(chunk_size) is one round trip and only one chunk is held
+        in memory.
+        """
+        # dmPython cursors already keep the result set on the server and
+        # fetch it arraysize rows at a time, so no server-side named cursor
+        # is needed: the cursor only has to stay out of the statement cache.
+        cursor = self._cursor()
+        cursor.cursor.streaming = True
+        return cursor
     
     def _set_autocommit(self, autocommit):
         with self.wrap_database_errors:
@@ -321,13 +477,9 @@ class DatabaseWrapper(BaseDatabaseWrapper):
         self.enable_constraint_checking()    
 
     def is_usable(self):
-        try:
-            cursor = self.connection.cursor()
-            cursor.execute('select 1 from dual')
-        except Database.Error:
-            return False
-        else:
-            return True
+        # Always probe after an error, a recent successful statement says
+        # nothing about the state of the session then.
+        return self.health_check.is_usable(self.connection, force=self.errors_occurred)
         
     @cached_property
     def dameng_full_version(self):
@@ -343,46 +495,130 @@ class DatabaseWrapper(BaseDatabaseWrapper):
 
 
 FORMAT_QMARK_REGEX = _lazy_re_compile(r'(?<!%)%s')
+
+# Whether the driver honours Cursor.setoutputsize() for LOB columns, checked
+# by the first connection using OPTIONS['lob_prefetch_size'].
+_lob_prefetch_supported = None
+
+# Default number of translated queries cached per connection, see
+# CursorWrapper.convert_query.
+QUERY_CACHE_SIZE = 512
+
+# Default number of prepared cursors kept per connection, see
+# CursorWrapper.execute. Disabled unless OPTIONS['statement_cache_size'] is set.
+STATEMENT_CACHE_SIZE = 0
     
 class CursorWrapper(object):
         
     codes_for_integrityerror = (1048,)
 
-    def __init__(self, cursor):
+    def __init__(self, cursor, db=None, streaming=False, fetch_size=None):
+        self.cursor = cursor
+        self.db = db
+        self.streaming = streaming
+        # Every statement starts with the configured arraysize, or the
+        # fetch size hint of the query, whatever cursor it runs on.
+        self.fetch_size = fetch_size
+        self._arraysize = cursor.arraysize
+        # Rows the driver still holds from its last round trip, see
+        # FetchStats.record.
+        self._buffered = 0
+        self._own_cursor = cursor
+        self._statement = None
+
+    def _checkout_statement(self, query):
+        """
+        Point the wrapper at the cached prepared cursor of the query.
+        """
+        self._checkin_statement()
+        cursor = self.db.statement_cache.checkout(self.db.connection, query, self.db._configure_cursor)
+        self._statement = (query, cursor)
         self.cursor = cursor
+
+    def _checkin_statement(self, discard=False):
+        """
+        Give the prepared cursor used by the previous statement back to the
+        cache and go back to the wrapper's own cursor.
+        """
+        if self._statement is None:
+            return
+        query, cursor = self._statement
+        self._statement = None
+        self.cursor = self._own_cursor
+        if discard:
+            self.db.statement_cache.discard(query, cursor)
+        else:
+            self.db.statement_cache.checkin(query, cursor)
     
+    def _bind_returning(self, args):
+        """
+        Replace the InsertVar parameters of an INSERT ... RETURNING statement
+        by output slots. Return the new args and the positions of the slots.
+        """
+        args = list(args)
+        pos_list = [i for i, arg in enumerate(args) if isinstance(arg, InsertVar)]
+        for i in pos_list:
+            args[i] = None
+        return tuple(args), tuple(pos_list)
+
     def convert_query(self, query):
-        return FORMAT_QMARK_REGEX.sub('?', query).replace('%%', '%')
+        cache = self.db.query_cache if self.db is not None else None
+        if cache is None or not cache.maxsize:
+            return FORMAT_QMARK_REGEX.sub('?', query).replace('%%', '%')
+
+        converted = cache.get(query)
+        if converted is None:
+            converted = FORMAT_QMARK_REGEX.sub('?', query).replace('%%', '%')
+            cache.put(query, converted)
+        return converted
     
+    def _reset_arraysize(self):
+        arraysize = self.fetch_size or self._arraysize
+        if self.cursor.arraysize != arraysize:
+            self.cursor.arraysize = arraysize
+
     def execute(self, query, args=None):
+        self._buffered = 0
+        if self.db is not None:
+            self.db.query_lob_reads = 0
         try:
             # args is None means no string interpolation
             try:
                 if args is None:
-                    return self.cursor.execute(query, args)
-                
-                args_temp = []
-                pos_list = []
-                has_returning = False
-                if type(args) is tuple or list:
-                    for i in range(len(args)):
-                        if isinstance(args[i], InsertVar):
-                            args_temp.append(None)
-                            has_returning = True
-                            pos_list.append(i)
-                        else:
-                            args_temp.append(args[i])
-
-                args = tuple(args_temp)
+                    self._checkin_statement()
+                    self._reset_arraysize()
+                    result = self.cursor.execute(query, args)
+                    if self.db is not None:
+                        self.db.health_check.mark_used()
+                    return result
                 
                 query = self.convert_query(query)
+
+                # Only INSERT ... RETURNING statements carry InsertVar
+                # parameters, all other statements bind args as they are.
+                pos_tup = None
+                if 'RETURNING' in query:
+                    args, pos_tup = self._bind_returning(args)
+                elif type(args) is not tuple and type(args) is not list:
+                    args = tuple(args)
+
+                if (not pos_tup and not self.streaming and self.db is not None and
+                        self.db.statement_cache.maxsize):
+                    self._checkout_statement(query)
+                else:
+                    self._checkin_statement()
+                self._reset_arraysize()
                 result = self.cursor.execute(query, args)
-                if has_returning:
+                if pos_tup:
                     self.returning_tup = tuple(result)
-                    self.has_returning = has_returning
-                    self.pos_tup = tuple(pos_list)
+                    self.has_returning = True
+                    self.pos_tup = pos_tup
+                if self.db is not None:
+                    self.db.health_check.mark_used()
                 return result
             except Database.DatabaseError as e:
+                # Don't hand a cursor in an unknown state back to the cache.
+                self._checkin_statement(discard=True)
                 if hasattr(e.args[0], "code") == False:
                     raise
                 
@@ -417,8 +653,14 @@ class CursorWrapper(object):
             return None
 
         try:
+            self._checkin_statement()
             query = self.convert_query(query)
-            return self.cursor.executemany(query, args)
+            if 'RETURNING' in query:
+                return self._executemany_returning(query, args)
+            result = self.cursor.executemany(query, args)
+            if self.db is not None:
+                self.db.health_check.mark_used()
+            return result
         except Database.OperationalError as e:
             # Map some error codes to IntegrityError, since they seem to be
             # misclassified and Django would prefer the more logical place.
@@ -426,6 +668,38 @@ class CursorWrapper(object):
                 raise IntegrityError(*tuple(e.args))
             raise
 
+    def _executemany_returning(self, query, args):
+        """
+        Run an INSERT ... RETURNING ... INTO statement for every row of args
+        and keep the returned values of each row in self.returned_rows.
+        The InsertVar parameters are replaced by output arrays so the whole
+        batch runs in one round trip.
+        """
+        rows = [list(row) for row in args]
+        positions = [i for i, arg in enumerate(rows[0]) if isinstance(arg, InsertVar)]
+
+        if not hasattr(self.cursor, 'var'):
+            # No output variables, fall back to one execute per row.
+            returned = []
+            for row in rows:
+                row, pos_tup = self._bind_returning(row)
+                result = self.cursor.execute(query, row)
+                returned.append(tuple(result[i] for i in pos_tup))
+        else:
+            insert_vars = [rows[0][i] for i in positions]
+            out_vars = [insert_var.bind_array(self.cursor, len(rows)) for insert_var in insert_vars]
+            for row in rows:
+                for i, out_var in zip(positions, out_vars):
+                    row[i] = out_var
+            self.cursor.executemany(query, rows)
+            columns = [insert_var.get_values(len(rows)) for insert_var in insert_vars]
+            returned = list(zip(*columns))
+
+        self.returned_rows = returned
+        if self.db is not None:
+            self.db.health_check.mark_used()
+        return None
+
     def __getattr__(self, attr):
         if attr == 'rowcount':
             pass
@@ -435,6 +709,35 @@ class CursorWrapper(object):
             return getattr(self.cursor, attr)
         return getattr(self.cursor, attr)
 
+    def fetchone(self):
+        row = self.cursor.fetchone()
+        if row is not None and self.db is not None:
+            self.db.fetch_stats.record(self, 1)
+        return row
+
+    def fetchmany(self, size=None):
+        if size is None:
+            rows = self.cursor.fetchmany()
+        else:
+            # Fetch a whole chunk in one round trip, unless the query set
+            # its own fetch size. execute() restores the arraysize.
+            if self.fetch_size is None and self.cursor.arraysize < size:
+                self.cursor.arraysize = size
+            rows = self.cursor.fetchmany(size)
+        if self.db is not None:
+            self.db.fetch_stats.record(self, len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self.cursor.fetchall()
+        if self.db is not None:
+            self.db.fetch_stats.record(self, len(rows))
+        return rows
+
+    def close(self):
+        self._checkin_statement()
+        self.cursor.close()
+
     def __iter__(self):
         return iter(self.cursor)
 
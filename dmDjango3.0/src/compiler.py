@@ -1,5 +1,6 @@
 import json
 import re
+from itertools import islice
 
 try:
     from itertools import zip_longest
@@ -10,23 +11,88 @@ from django.db.models.sql import compiler
 from django.db.models.fields.json import KeyTransform, KeyTransformExact, KeyTransformIsNull
 from django.db.models.fields.json import HasAnyKeys, HasKey, HasKeys, DataContains, ContainedBy
 from django.db.models.expressions import Exists
-from django.db.models.lookups import Exact
+from django.db.models.lookups import Exact, In
 from django.db.models.fields.json import compile_json_path
 
 from django.core.exceptions import EmptyResultSet, FieldError
 from django.db import DatabaseError, NotSupportedError
-from django.db.models.expressions import F, OrderBy, RawSQL, Ref, Value
+from django.db.models.expressions import Case, Col, F, OrderBy, RawSQL, Ref, Value
+from django.db.models.query_utils import Q
+from django.db.models.sql.where import WhereNode
 if django.VERSION>=(3,2):
     from django.db.models.functions.math import Random
 if django.VERSION<(3,2):
     from django.db.models.expressions import Random
 from django.db.models.functions import Cast
 
-from django.db.models.sql.constants import ORDER_DIR
+from django.db.models.sql.constants import GET_ITERATOR_CHUNK_SIZE, MULTI, ORDER_DIR
 from django.db.models.sql.query import get_order_dir
 from django.utils.hashable import make_hashable
 
+_fetch_first_re = re.compile(r'FETCH FIRST (\d+) ROWS ONLY$')
+
+def _bind_converters(converters, expression, connection):
+    """
+    Return a one argument function applying the converters of a column.
+    """
+    if len(converters) == 1:
+        converter = converters[0]
+        return lambda value: converter(value, expression, connection)
+
+    def convert(value):
+        for converter in converters:
+            value = converter(value, expression, connection)
+        return value
+    return convert
+
+
 class SQLCompiler(compiler.SQLCompiler):
+    def execute_sql(self, result_type=MULTI, chunked_fetch=False, chunk_size=GET_ITERATOR_CHUNK_SIZE):
+        # The fetch size hint of DMQuerySet.using_fetch_size() becomes the
+        # fetchmany() chunk size and the arraysize of the cursor running
+        # the query, which is created by the super() call.
+        fetch_size = getattr(self.query, 'fetch_size', None)
+        if fetch_size is None:
+            return super().execute_sql(result_type, chunked_fetch, chunk_size)
+        self.connection.fetch_size = fetch_size
+        try:
+            return super().execute_sql(result_type, chunked_fetch, fetch_size)
+        finally:
+            self.connection.fetch_size = None
+
+    def as_sql(self, with_limits=True, with_col_aliases=False):
+        sql, params = super().as_sql(with_limits, with_col_aliases)
+        # DMQuerySet.vector_search() turns the row limit of a nearest
+        # neighbour query into an approximate fetch through the vector index.
+        vector_search = getattr(self.query, 'vector_search', None)
+        if vector_search is not None and with_limits and not self.query.combinator:
+            if self.query.low_mark:
+                raise NotSupportedError("Approximate vector searches do not support an offset.")
+            match = _fetch_first_re.search(sql)
+            if match is not None:
+                sql = sql[:match.start()] + self.connection.ops.approximate_fetch_sql(
+                    int(match.group(1)), **vector_search
+                )
+        return sql, params
+
+    def apply_converters(self, rows, converters):
+        # Convert the rows a fetch chunk at a time and column by column, with
+        # the converters of each column bound once per query.
+        columns = [
+            (pos, _bind_converters(convs, expression, self.connection))
+            for pos, (convs, expression) in converters.items()
+        ]
+        batch_size = getattr(self.query, 'fetch_size', None) or GET_ITERATOR_CHUNK_SIZE
+        rows = iter(rows)
+        while True:
+            batch = [list(row) for row in islice(rows, batch_size)]
+            if not batch:
+                return
+            for pos, convert in columns:
+                for row in batch:
+                    row[pos] = convert(row[pos])
+            yield from batch
+
     def compile(self, node, select_format=False):
         vendor_impl = getattr(node, 'as_' + self.connection.vendor, None)
         
@@ -102,28 +168,298 @@ class SQLInsertCompiler(compiler.SQLInsertCompiler, SQLCompiler):
         self.return_id = False
         super(SQLInsertCompiler, self).__init__(*args, **kwargs)
 
-    def fix_auto(self, sql, opts, fields, qn):
-        if opts.auto_field is not None:
-            auto_field_column = opts.auto_field.db_column or opts.auto_field.column
-            columns = [f.column for f in fields]
+    def _identity_insert_table(self, fields):
+        """
+        Return the quoted table name if the statement supplies values for the
+        identity column, which DM only accepts under SET IDENTITY_INSERT.
+        """
+        opts = self.query.get_meta()
+        if opts.auto_field is None:
+            return None
+        auto_field_column = opts.auto_field.db_column or opts.auto_field.column
+        if fields and auto_field_column not in [f.column for f in fields]:
+            return None
+        return self.connection.ops.quote_name(opts.db_table)
 
-            if auto_field_column in columns and fields or not fields and auto_field_column:
-                table = qn(opts.db_table)
-                sql_format = 'SET IDENTITY_INSERT %s ON WITH REPLACE NULL; %s; SET IDENTITY_INSERT %s OFF;'
-                sql = sql_format % (table, sql, table)
+    def _value_rows(self, fields):
+        return [
+            [self.prepare_value(field, self.pre_save_val(field, obj)) for field in fields]
+            for obj in self.query.objs
+        ]
 
-        return sql
-    
-    def as_sql(self):
-        result = super().as_sql()
-        for sql, params in result:
-            opts = self.query.get_meta()
+    def _bulk_statements(self):
+        """
+        Yield the INSERT statements of a bulk insert without returning
+        columns. The rows are spread over as many statements as needed to
+        keep each one within features.max_query_params bound values, and
+        each statement is built only when the previous one has been used.
+        """
+        fields = self.query.fields
+        if (self.returning_fields or not fields or len(self.query.objs) < 2 or
+                not self.connection.features.has_bulk_insert):
+            yield from super().as_sql()
+            return
+
+        qn = self.connection.ops.quote_name
+        head = 'INSERT INTO %s (%s) ' % (
+            qn(self.query.get_meta().db_table),
+            ', '.join(qn(f.column) for f in fields),
+        )
+        max_params = self.connection.features.max_query_params
+
+        placeholder_rows, param_rows = [], []
+        count = 0
+        for obj in self.query.objs:
+            value_row = [self.prepare_value(field, self.pre_save_val(field, obj)) for field in fields]
+            (placeholders,), (params,) = self.assemble_as_sql(fields, [value_row])
+            if placeholder_rows and count + len(params) > max_params:
+                yield self._bulk_statement(head, fields, placeholder_rows, param_rows)
+                placeholder_rows, param_rows = [], []
+                count = 0
+            placeholder_rows.append(placeholders)
+            param_rows.append(params)
+            count += len(params)
+        yield self._bulk_statement(head, fields, placeholder_rows, param_rows)
+
+    def _bulk_statement(self, head, fields, placeholder_rows, param_rows):
+        sql = head + self.connection.ops.bulk_insert_sql(fields, placeholder_rows)
+        return sql, tuple(p for ps in param_rows for p in ps)
+
+    def as_array_sql(self):
+        """
+        Return a single-row INSERT and the parameter rows to bind to it with
+        executemany(), or None if the rows can't share one statement (e.g.
+        some values are expressions compiling to different SQL).
+        """
+        fields = self.query.fields
+        if not fields or len(self.query.objs) < 2:
+            return None
+
+        placeholder_rows, param_rows = self.assemble_as_sql(fields, self._value_rows(fields))
+        placeholders = placeholder_rows[0]
+        for row in placeholder_rows:
+            if row != placeholders:
+                return None
+
+        qn = self.connection.ops.quote_name
+        sql = 'INSERT INTO %s (%s) VALUES (%s)' % (
+            qn(self.query.get_meta().db_table),
+            ', '.join(qn(f.column) for f in fields),
+            ', '.join(placeholders),
+        )
+        return sql, param_rows
+
+    def _execute_returning_rows(self, returning_fields):
+        """
+        Insert several rows and return the returning_fields of each of them,
+        using one INSERT ... RETURNING ... INTO statement bound to all rows.
+        """
+        self.returning_fields = returning_fields
+        opts = self.query.get_meta()
+        qn = self.connection.ops.quote_name
+        if self.query.fields:
+            fields = self.query.fields
+            columns = [qn(f.column) for f in fields]
+            value_rows = self._value_rows(fields)
+        else:
+            # Empty objects, let the identity column generate everything.
+            fields = [None]
+            columns = [qn(opts.pk.column)]
+            value_rows = [[self.connection.ops.pk_default_value()] for _ in self.query.objs]
+
+        placeholder_rows, param_rows = self.assemble_as_sql(fields, value_rows)
+        r_sql, self.returning_params = self.connection.ops.return_insert_columns(returning_fields)
+        head = 'INSERT INTO %s (%s) VALUES ' % (qn(opts.db_table), ', '.join(columns))
+        table = self._identity_insert_table(self.query.fields)
+
+        with self.connection.cursor() as cursor:
+            if table is not None:
+                cursor.execute('SET IDENTITY_INSERT %s ON WITH REPLACE NULL' % table)
+            try:
+                placeholders = placeholder_rows[0]
+                if all(row == placeholders for row in placeholder_rows):
+                    sql = '%s(%s) %s' % (head, ', '.join(placeholders), r_sql)
+                    cursor.executemany(sql, [tuple(params) + tuple(self.returning_params) for params in param_rows])
+                    rows = self.connection.ops.fetch_returned_insert_rows(cursor)
+                else:
+                    # Expressions compile to different SQL per row.
+                    rows = []
+                    for placeholders, params in zip(placeholder_rows, param_rows):
+                        sql = '%s(%s) %s' % (head, ', '.join(placeholders), r_sql)
+                        cursor.execute(sql, tuple(params) + tuple(self.returning_params))
+                        rows.append(self.connection.ops.fetch_returned_insert_columns(cursor, self.returning_params))
+            finally:
+                if table is not None:
+                    cursor.execute('SET IDENTITY_INSERT %s OFF' % table)
+
+        converters = self.get_converters([field.get_col(opts.db_table) for field in returning_fields])
+        if converters:
+            rows = list(self.apply_converters(rows, converters))
+        return rows
+
+    def _conflict_mode(self):
+        """
+        Return 'ignore' or 'update' when bulk_create() was called with
+        ignore_conflicts or update_conflicts, None otherwise.
+        """
+        on_conflict = getattr(self.query, 'on_conflict', None)
+        if on_conflict is not None:
+            return getattr(on_conflict, 'value', on_conflict)
+        if getattr(self.query, 'ignore_conflicts', False):
+            return 'ignore'
+        return None
 
-            qn = self.connection.ops.quote_name
+    def _resolve_fields(self, fields):
+        opts = self.query.get_meta()
+        resolved = []
+        for field in fields or ():
+            if isinstance(field, str):
+                field = opts.get_field(opts.pk.name if field == 'pk' else field)
+            resolved.append(field)
+        return resolved
 
-            sql = self.fix_auto(sql, opts, self.query.fields, qn)
+    def _conflict_keys(self, mode, fields):
+        """
+        Return the groups of columns that identify an existing row: the
+        unique_fields for update_conflicts, every unique constraint covered
+        by the inserted fields for ignore_conflicts.
+        """
+        if mode == 'update':
+            return [[f.column for f in self._resolve_fields(self.query.unique_fields)]]
+
+        opts = self.query.get_meta()
+        keys = [[field.column] for field in fields if field.unique]
+        for field_names in opts.unique_together:
+            keys.append([opts.get_field(name).column for name in field_names])
+        for constraint in getattr(opts, 'total_unique_constraints', ()):
+            if constraint.fields:
+                keys.append([opts.get_field(name).column for name in constraint.fields])
+
+        columns = {f.column for f in fields}
+        unique_keys = []
+        for key in keys:
+            if set(key) <= columns and key not in unique_keys:
+                unique_keys.append(key)
+        return unique_keys
+
+    def as_merge_sql(self, mode):
+        """
+        Compile an insert with ignore_conflicts/update_conflicts into a
+        MERGE INTO ... USING (SELECT ? ... FROM DUAL) statement. Return a
+        list of (sql, param_rows) pairs, normally a single statement to bind
+        to every row with executemany(), or None if no unique key can
+        detect conflicts.
+        """
+        fields = self.query.fields
+        keys = self._conflict_keys(mode, fields) if fields else []
+        if not keys:
+            return None
+
+        qn = self.connection.ops.quote_name
+        table = qn(self.query.get_meta().db_table)
+        source = qn('dm_source')
+        columns = [qn(f.column) for f in fields]
+
+        on_sql = ' OR '.join(
+            '(%s)' % ' AND '.join(
+                '%s.%s = %s.%s' % (table, qn(column), source, qn(column)) for column in key
+            ) for key in keys
+        )
+        update_columns = []
+        if mode == 'update':
+            # Columns of the ON clause can't be updated.
+            key_columns = {column for key in keys for column in key}
+            update_columns = [
+                qn(f.column) for f in self._resolve_fields(self.query.update_fields)
+                if f.column not in key_columns
+            ]
 
-        return [(sql, params),]
+        def merge_sql(placeholders):
+            sql = 'MERGE INTO %s USING (SELECT %s FROM DUAL) %s ON (%s)' % (
+                table,
+                ', '.join('%s %s' % pair for pair in zip(placeholders, columns)),
+                source,
+                on_sql,
+            )
+            if update_columns:
+                sql += ' WHEN MATCHED THEN UPDATE SET %s' % ', '.join(
+                    '%s.%s = %s.%s' % (table, column, source, column) for column in update_columns
+                )
+            sql += ' WHEN NOT MATCHED THEN INSERT (%s) VALUES (%s)' % (
+                ', '.join(columns),
+                ', '.join('%s.%s' % (source, column) for column in columns),
+            )
+            return sql
+
+        placeholder_rows, param_rows = self.assemble_as_sql(fields, self._value_rows(fields))
+        placeholders = placeholder_rows[0]
+        if all(row == placeholders for row in placeholder_rows):
+            return [(merge_sql(placeholders), param_rows)]
+        return [(merge_sql(p), [params]) for p, params in zip(placeholder_rows, param_rows)]
+
+    def _execute_merge(self, statements):
+        table = self._identity_insert_table(self.query.fields)
+        with self.connection.cursor() as cursor:
+            if table is not None:
+                cursor.execute('SET IDENTITY_INSERT %s ON WITH REPLACE NULL' % table)
+            try:
+                for sql, param_rows in statements:
+                    if len(param_rows) > 1:
+                        cursor.executemany(sql, param_rows)
+                    else:
+                        cursor.execute(sql, param_rows[0])
+            finally:
+                if table is not None:
+                    cursor.execute('SET IDENTITY_INSERT %s OFF' % table)
+
+    def execute_sql(self, returning_fields=None):
+        mode = self._conflict_mode()
+        if mode is not None:
+            statements = self.as_merge_sql(mode)
+            if statements is not None:
+                # MERGE can't return the generated columns, Django leaves the
+                # objects untouched when nothing is returned for an upsert.
+                self._execute_merge(statements)
+                return []
+
+        if returning_fields and len(self.query.objs) > 1:
+            return self._execute_returning_rows(returning_fields)
+        if returning_fields:
+            return super().execute_sql(returning_fields)
+
+        table = self._identity_insert_table(self.query.fields)
+        array_sql = self.as_array_sql()
+        statements = None if array_sql is not None else self._bulk_statements()
+        with self.connection.cursor() as cursor:
+            # Switch IDENTITY_INSERT on once for the whole load, not once
+            # per statement.
+            if table is not None:
+                cursor.execute('SET IDENTITY_INSERT %s ON WITH REPLACE NULL' % table)
+            try:
+                if array_sql is not None:
+                    cursor.executemany(*array_sql)
+                else:
+                    for sql, params in statements:
+                        cursor.execute(sql, params)
+            finally:
+                if table is not None:
+                    cursor.execute('SET IDENTITY_INSERT %s OFF' % table)
+        return []
+
+    def as_sql(self):
+        mode = self._conflict_mode()
+        statements = self.as_merge_sql(mode) if mode is not None else None
+        if statements is not None:
+            result = [(sql, tuple(params)) for sql, param_rows in statements for params in param_rows]
+        else:
+            result = list(self._bulk_statements())
+        table = self._identity_insert_table(self.query.fields)
+        if table is not None and result:
+            sql, params = result[0]
+            result[0] = ('SET IDENTITY_INSERT %s ON WITH REPLACE NULL; %s' % (table, sql), params)
+            sql, params = result[-1]
+            result[-1] = ('%s; SET IDENTITY_INSERT %s OFF;' % (sql, table), params)
+        return result
 
     def field_as_sql(self, field, val):
         """
@@ -156,7 +492,112 @@ class SQLDeleteCompiler(compiler.SQLDeleteCompiler, SQLCompiler):
     pass
 
 class SQLUpdateCompiler(compiler.SQLUpdateCompiler, SQLCompiler):
-    pass
+    def _when_pk(self, when, pk):
+        """
+        Return the primary key value matched by a When(pk=...) of
+        QuerySet.bulk_update(), or raise ValueError for any other condition.
+        """
+        condition = when.condition
+        if isinstance(condition, Q):
+            if not condition.negated and len(condition.children) == 1:
+                name, value = condition.children[0]
+                if name in ('pk', pk.name, pk.attname) and not hasattr(value, 'resolve_expression'):
+                    return value
+        elif isinstance(condition, WhereNode):
+            if not condition.negated and len(condition.children) == 1:
+                lookup = condition.children[0]
+                if (isinstance(lookup, Exact) and isinstance(lookup.lhs, Col) and
+                        lookup.lhs.target == pk and not hasattr(lookup.rhs, 'resolve_expression')):
+                    return lookup.rhs
+        raise ValueError('Not a primary key condition')
+
+    def _bulk_update_rows(self):
+        """
+        Recognize the UPDATE ... SET f = CASE WHEN pk = ? THEN ? ... END
+        WHERE pk IN (...) query built by QuerySet.bulk_update() and return
+        the updated fields with one (pk, value, ...) row per object, or None
+        for any other update.
+        """
+        query = self.query
+        pk = query.get_meta().pk
+        if not query.values or query.related_updates:
+            return None
+
+        where = query.where
+        if where.negated or len(where.children) != 1:
+            return None
+        lookup = where.children[0]
+        if not (isinstance(lookup, In) and isinstance(lookup.lhs, Col) and lookup.lhs.target == pk):
+            return None
+
+        if not isinstance(lookup.rhs, (list, tuple, set)):
+            return None
+
+        fields = []
+        columns = []
+        pks = None
+        try:
+            for field, model, val in query.values:
+                if not isinstance(val, Case) or field == pk or hasattr(field, 'get_placeholder'):
+                    return None
+                # Rows matched by no WHEN get the default, which the MERGE
+                # doesn't update: only the NULL default of bulk_update() is
+                # safe, and only when every row of the IN list has a WHEN.
+                if not (isinstance(val.default, Value) and val.default.value is None):
+                    return None
+                values = {}
+                for when in val.cases:
+                    if not isinstance(when.result, Value):
+                        return None
+                    # The first matching WHEN wins, as in the CASE statement.
+                    values.setdefault(self._when_pk(when, pk), when.result.value)
+                if pks is None:
+                    pks = list(values)
+                    if set(pks) != set(lookup.rhs):
+                        return None
+                elif set(pks) != set(values):
+                    return None
+                fields.append(field)
+                columns.append(values)
+        except (TypeError, ValueError):
+            return None
+
+        connection = self.connection
+        rows = [
+            [pk.get_db_prep_value(value, connection)] +
+            [field.get_db_prep_save(values[value], connection) for field, values in zip(fields, columns)]
+            for value in pks
+        ]
+        return fields, rows
+
+    def as_merge_sql(self):
+        """
+        Return a MERGE statement updating the rows of a bulk_update() batch
+        from a source bound to one (pk, value, ...) row per object, and the
+        rows to bind with executemany(). Return None if the update wasn't
+        built by bulk_update().
+        """
+        bulk_update = self._bulk_update_rows()
+        if bulk_update is None:
+            return None
+        fields, rows = bulk_update
+        opts = self.query.get_meta()
+        sql = self.connection.ops.bulk_update_merge_sql(
+            opts.db_table, opts.pk.column, [field.column for field in fields],
+        )
+        return sql, rows
+
+    def execute_sql(self, result_type):
+        merge_sql = self.as_merge_sql()
+        if merge_sql is None:
+            return super().execute_sql(result_type)
+
+        sql, rows = merge_sql
+        if not rows:
+            return 0
+        with self.connection.cursor() as cursor:
+            cursor.executemany(sql, rows)
+            return cursor.rowcount
 
 class SQLAggregateCompiler(compiler.SQLAggregateCompiler, SQLCompiler):
     pass
@@ -40,6 +40,7 @@ class DatabaseFeatures(BaseDatabaseFeatures):
     supports_select_for_update_with_limit = False
     allows_group_by_select_index = False
     can_return_columns_from_insert = True
+    can_return_rows_from_bulk_insert = True
     has_select_for_update_of = True
     select_for_update_of_column = True
     has_select_for_update_skip_locked = True
@@ -50,7 +51,9 @@ class DatabaseFeatures(BaseDatabaseFeatures):
     supports_partial_indexes = False
     supports_json_field = True
 
-    supports_ignore_conflicts = False
+    supports_ignore_conflicts = True
+    supports_update_conflicts = True
+    supports_update_conflicts_with_target = True
     supports_boolean_expr_in_select_clause = False
     
     supports_deferrable_unique_constraints = False
@@ -63,6 +66,10 @@ class DatabaseFeatures(BaseDatabaseFeatures):
     can_introspect_autofield = True
     
     supports_paramstyle_pyformat = False
+
+    # Upper bound of the values bound by one statement or executemany()
+    # call, used to size bulk_create() batches.
+    max_query_params = 2 ** 16 - 1
     
     time_cast_precision = 0
     
@@ -0,0 +1,131 @@
+"""
+Bulk loading of embeddings into a VectorField.
+"""
+import os
+import time
+import warnings
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .vector import HnswVectorIndex, IvfVectorIndex, VectorField, encode_vector
+
+
+def _vector_indexes(connection, model, field_name):
+    """
+    Return the vector indexes of field_name that exist. A deferred index may
+    not be built yet, it is left pending rather than built by the load.
+    """
+    indexes = [
+        index for index in model._meta.indexes
+        if isinstance(index, (HnswVectorIndex, IvfVectorIndex)) and field_name in index.fields
+    ]
+    if any(index.deferred for index in indexes):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+        names = set(name.upper() for name in constraints)
+        indexes = [index for index in indexes if not index.deferred or index.name.upper() in names]
+    return indexes
+
+
+def ingest_vectors(model, field_name, source, columns=None, chunk_size=10000, using=None,
+                   defer_indexes=False, progress=None):
+    """
+    Insert one row of model per row of source into the VectorField
+    field_name and return the load statistics.
+
+    source is a 2-D numpy array or the path of a .npy file, which is memory
+    mapped so only chunk_size rows are in memory at a time. columns maps the
+    names of other fields to sequences holding one value per row. Every
+    chunk is inserted by a single array-bound executemany().
+
+    With defer_indexes=True the vector indexes of field_name are dropped
+    before the load and created again after it, which is much faster than
+    maintaining them row by row but leaves the table without them, for all
+    the connections, while the load runs. If the load fails the indexes are
+    still created again; an error doing so only warns, so the load error is
+    the one raised. progress, if given, is called after every
+    chunk with the number of rows loaded, the total and the rows per second.
+    """
+    import numpy
+    field = model._meta.get_field(field_name)
+    if not isinstance(field, VectorField):
+        raise ValueError("%s is not a VectorField" % field_name)
+    if type(chunk_size) is not int or chunk_size < 1:
+        raise ValueError("The chunk_size must be a positive integer")
+    if isinstance(source, (str, os.PathLike)):
+        source = numpy.load(source, mmap_mode='r')
+    if source.ndim != 2 or source.shape[1] != field.dim:
+        raise ValueError(
+            "expected a matrix of %s dimensions vectors, but got shape %s" % (field.dim, source.shape)
+        )
+    total = source.shape[0]
+    columns = [(model._meta.get_field(name), values) for name, values in (columns or {}).items()]
+    for column_field, values in columns:
+        if len(values) != total:
+            raise ValueError(
+                "expected %s values for %s, but got %s" % (total, column_field.name, len(values))
+            )
+
+    using = using or DEFAULT_DB_ALIAS
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    fields = [column_field for column_field, _ in columns] + [field]
+    sql = 'INSERT INTO %s (%s) VALUES (%s)' % (
+        qn(model._meta.db_table),
+        ', '.join(qn(f.column) for f in fields),
+        ', '.join(['%s'] * len(fields)),
+    )
+
+    indexes = _vector_indexes(connection, model, field_name) if defer_indexes else []
+    if indexes:
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.remove_index(model, index)
+
+    def create_indexes():
+        with connection.schema_editor() as editor:
+            # Deferred indexes were built before the load, build them again.
+            editor.build_deferred_indexes = True
+            for index in indexes:
+                editor.add_index(model, index)
+
+    start = time.monotonic()
+    loaded = 0
+    try:
+        with connection.cursor() as cursor:
+            for offset in range(0, total, chunk_size):
+                # Only this slice of a memory mapped source is read.
+                vectors = numpy.asarray(source[offset:offset + chunk_size])
+                values = [
+                    [column_field.get_db_prep_save(value, connection) for value in column_values[offset:offset + chunk_size]]
+                    for column_field, column_values in columns
+                ]
+                values.append([encode_vector(vector) for vector in vectors])
+                cursor.executemany(sql, list(zip(*values)))
+                loaded += len(vectors)
+                if progress is not None:
+                    elapsed = time.monotonic() - start
+                    progress(loaded, total, loaded / elapsed if elapsed else 0.0)
+    except BaseException:
+        if indexes:
+            try:
+                create_indexes()
+            except Exception as exc:
+                warnings.warn(
+                    "The vector indexes of %s could not be created again after the failed load: %s"
+                    % (field_name, exc), RuntimeWarning,
+                )
+        raise
+    load_time = time.monotonic() - start
+
+    index_start = time.monotonic()
+    if indexes:
+        create_indexes()
+    index_time = time.monotonic() - index_start
+
+    return {
+        'rows': loaded,
+        'load_time': load_time,
+        'rows_per_second': loaded / load_time if load_time else 0.0,
+        'index_time': index_time,
+    }
@@ -0,0 +1,347 @@
+"""
+Streaming access to Dameng LOB columns.
+
+BinaryField and TextField values are read into memory as a whole by the
+backend converters. The fields and the storage defined here hand out
+file-like readers over the Database.LOB locator instead and write LOB content
+chunk by chunk through the locator, so large values are transferred with
+constant memory.
+"""
+import io
+import posixpath
+from base64 import b64encode
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.files.base import File
+from django.core.files.storage import Storage
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+from django.utils.encoding import filepath_to_uri
+
+LOB_CHUNK_SIZE = 1024 * 1024
+
+
+class LobReader(io.IOBase):
+    """
+    Seekable, read only file-like object over a Database.LOB locator.
+
+    Every read fetches at most ``chunk_size`` bytes (characters for a CLOB)
+    from the server, iterate over chunks() to stream the whole value.
+    """
+
+    def __init__(self, lob, connection=None, text=False, chunk_size=LOB_CHUNK_SIZE):
+        self._lob = lob
+        self._connection = connection
+        self._empty = '' if text else b''
+        self._pos = 0
+        self._size = None
+        self.chunk_size = chunk_size
+
+    @property
+    def size(self):
+        if self._size is None:
+            self._size = self._lob.size()
+        return self._size
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self.size + offset
+        else:
+            raise ValueError("invalid whence (%r)" % whence)
+        if pos < 0:
+            raise ValueError("negative seek position %r" % pos)
+        self._pos = pos
+        return pos
+
+    def _read_chunk(self, amount):
+        if self._connection is not None:
+            self._connection.lob_reads += 1
+            self._connection.query_lob_reads += 1
+        # LOB offsets are 1-based.
+        data = self._lob.read(self._pos + 1, amount)
+        self._pos += len(data)
+        return data
+
+    def read(self, size=-1):
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        remaining = self.size - self._pos
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        if size <= 0:
+            return self._empty
+        if size <= self.chunk_size:
+            return self._read_chunk(size)
+        parts = []
+        while size > 0:
+            data = self._read_chunk(min(size, self.chunk_size))
+            if not data:
+                break
+            parts.append(data)
+            size -= len(data)
+        return self._empty.join(parts)
+
+    def readall(self):
+        return self.read()
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def chunks(self, chunk_size=None):
+        """
+        Yield the rest of the LOB, ``chunk_size`` at a time.
+        """
+        chunk_size = chunk_size or self.chunk_size
+        while True:
+            data = self.read(chunk_size)
+            if not data:
+                return
+            yield data
+
+
+def open_lob(value, connection=None, text=False, chunk_size=LOB_CHUNK_SIZE):
+    """
+    Return a file-like object over a LOB column value. Values that the driver
+    already returned inline (see OPTIONS['lob_prefetch_size']) are wrapped in
+    an in-memory stream.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return io.StringIO(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return io.BytesIO(bytes(value))
+    return LobReader(value, connection=connection, text=text, chunk_size=chunk_size)
+
+
+def _iter_chunks(content, chunk_size):
+    if isinstance(content, (str, bytes)):
+        for start in range(0, len(content), chunk_size):
+            yield content[start:start + chunk_size]
+    elif hasattr(content, 'chunks'):
+        yield from content.chunks(chunk_size)
+    elif hasattr(content, 'read'):
+        while True:
+            data = content.read(chunk_size)
+            if not data:
+                return
+            yield data
+    else:
+        yield from content
+
+
+def _write_locator(connection, table, column, key_column, key, content, chunk_size):
+    """
+    Write ``content`` chunk by chunk into the LOB locator of the selected row
+    and return the written length. The row must hold an EMPTY_BLOB() or
+    EMPTY_CLOB() value and the call must run inside a transaction.
+    """
+    qn = connection.ops.quote_name
+    connection.ensure_connection()
+    with connection.wrap_database_errors:
+        # Use a driver cursor: the backend cursors may fetch small LOBs
+        # inline and a locator is needed here, even for an empty value.
+        cursor = connection.connection.cursor()
+        try:
+            cursor.execute(
+                'SELECT %s FROM %s WHERE %s = ? FOR UPDATE' % (qn(column), qn(table), qn(key_column)),
+                (key,),
+            )
+            row = cursor.fetchone()
+            if row is None:
+                raise connection.Database.DatabaseError(
+                    "No row with %s = %r in %s" % (key_column, key, table)
+                )
+            lob = row[0]
+            offset = 1
+            for data in _iter_chunks(content, chunk_size):
+                if data:
+                    lob.write(data, offset)
+                    offset += len(data)
+        finally:
+            cursor.close()
+    return offset - 1
+
+
+def write_lob(instance, field_name, content, using=None, chunk_size=LOB_CHUNK_SIZE):
+    """
+    Stream ``content`` (str, bytes, a file-like object or an iterable of
+    chunks) into the LOB column ``field_name`` of a saved model instance.
+    """
+    model = type(instance)
+    field = model._meta.get_field(field_name)
+    using = using or instance._state.db or DEFAULT_DB_ALIAS
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    table = model._meta.db_table
+    pk_column = model._meta.pk.column
+    pk_value = model._meta.pk.get_db_prep_value(instance.pk, connection)
+    empty = 'EMPTY_CLOB()' if field.get_internal_type() == 'TextField' else 'EMPTY_BLOB()'
+    with transaction.atomic(using=using):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'UPDATE %s SET %s = %s WHERE %s = %%s' % (qn(table), qn(field.column), empty, qn(pk_column)),
+                [pk_value],
+            )
+        return _write_locator(connection, table, field.column, pk_column, pk_value, content, chunk_size)
+
+
+def _read_stream(value):
+    if hasattr(value, 'read'):
+        if value.seekable():
+            value.seek(0)
+        return value.read()
+    return value
+
+
+class StreamingBinaryField(models.BinaryField):
+    """
+    BinaryField that loads its value as a file-like object over the BLOB
+    instead of bytes. Use write_lob() to store large values with constant
+    memory, saving the instance reads the file-like value in full.
+    """
+    stream_lob = True
+
+    def from_db_value(self, value, expression, connection):
+        return open_lob(value, connection)
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        return super().get_db_prep_value(_read_stream(value), connection, prepared)
+
+    def value_to_string(self, obj):
+        return b64encode(_read_stream(self.value_from_object(obj))).decode('ascii')
+
+
+class StreamingTextField(models.TextField):
+    """
+    TextField that loads its value as a file-like object over the CLOB
+    instead of str. Use write_lob() to store large values with constant
+    memory, saving the instance reads the file-like value in full.
+    """
+    stream_lob = True
+
+    def from_db_value(self, value, expression, connection):
+        return open_lob(value, connection, text=True)
+
+    def get_prep_value(self, value):
+        return super().get_prep_value(_read_stream(value))
+
+
+@deconstructible
+class DMBlobStorage(Storage):
+    """
+    File storage keeping file contents in a BLOB table of a Dameng database.
+
+    The table is created with create_table(). Files are written and opened
+    through LOB locators, so they are streamed ``chunk_size`` bytes at a time.
+    """
+
+    def __init__(self, using=None, table=None, base_url=None, chunk_size=None):
+        self.using = using or DEFAULT_DB_ALIAS
+        self.table = table or 'DJANGO_BLOB_STORAGE'
+        self.base_url = base_url
+        self.chunk_size = chunk_size or LOB_CHUNK_SIZE
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    def _sql(self, sql):
+        qn = self.connection.ops.quote_name
+        return sql % {
+            'table': qn(self.table),
+            'name': qn('name'),
+            'content': qn('content'),
+            'size': qn('file_size'),
+            'modified': qn('modified'),
+        }
+
+    def create_table(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(self._sql(
+                'CREATE TABLE %(table)s (%(name)s NVARCHAR2(255) PRIMARY KEY, '
+                '%(content)s BLOB, %(size)s BIGINT NOT NULL, %(modified)s TIMESTAMP NOT NULL)'
+            ))
+
+    def _fetch(self, name, column):
+        with self.connection.cursor() as cursor:
+            cursor.execute(self._sql('SELECT %s FROM %%(table)s WHERE %%(name)s = %%%%s' % column), [name])
+            row = cursor.fetchone()
+        if row is None:
+            raise FileNotFoundError("No such file in %s: %r" % (self.table, name))
+        return row[0]
+
+    def _open(self, name, mode='rb'):
+        if any(c in mode for c in 'wax+'):
+            raise ValueError("DMBlobStorage files can only be opened for reading, use save()")
+        value = self._fetch(name, '%(content)s')
+        return File(open_lob(value, self.connection, chunk_size=self.chunk_size), name=name)
+
+    def _save(self, name, content):
+        connection = self.connection
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        with transaction.atomic(using=self.using):
+            with connection.cursor() as cursor:
+                cursor.execute(self._sql('DELETE FROM %(table)s WHERE %(name)s = %%s'), [name])
+                cursor.execute(self._sql(
+                    'INSERT INTO %(table)s (%(name)s, %(content)s, %(size)s, %(modified)s) '
+                    'VALUES (%%s, EMPTY_BLOB(), 0, %%s)'
+                ), [name, now])
+                size = _write_locator(connection, self.table, 'content', 'name', name, content, self.chunk_size)
+                cursor.execute(self._sql('UPDATE %(table)s SET %(size)s = %%s WHERE %(name)s = %%s'), [size, name])
+        return name
+
+    def delete(self, name):
+        with self.connection.cursor() as cursor:
+            cursor.execute(self._sql('DELETE FROM %(table)s WHERE %(name)s = %%s'), [name])
+
+    def exists(self, name):
+        with self.connection.cursor() as cursor:
+            cursor.execute(self._sql('SELECT 1 FROM %(table)s WHERE %(name)s = %%s'), [name])
+            return cursor.fetchone() is not None
+
+    def listdir(self, path):
+        prefix = posixpath.join(path, '') if path else ''
+        pattern = self.connection.ops.prep_for_like_query(prefix) + '%'
+        with self.connection.cursor() as cursor:
+            cursor.execute(self._sql("SELECT %(name)s FROM %(table)s WHERE %(name)s LIKE %%s ESCAPE '\\'"), [pattern])
+            names = [row[0] for row in cursor.fetchall()]
+        directories, files = set(), []
+        for name in names:
+            rest = name[len(prefix):]
+            if '/' in rest:
+                directories.add(rest.split('/', 1)[0])
+            else:
+                files.append(rest)
+        return sorted(directories), sorted(files)
+
+    def size(self, name):
+        return self._fetch(name, '%(size)s')
+
+    def get_modified_time(self, name):
+        value = self._fetch(name, '%(modified)s')
+        if settings.USE_TZ:
+            value = timezone.make_aware(value, self.connection.timezone)
+        return value
+
+    def url(self, name):
+        if self.base_url is None:
+            raise ValueError("This file is not accessible via a URL, no base_url was given.")
+        return urljoin(self.base_url, filepath_to_uri(name).lstrip('/'))
@@ -23,6 +23,16 @@ from django.db.models.sql.where import WhereNode
 from django.db.models.expressions import RawSQL
 from decimal import Decimal
 
+# Per value type conversions of DecimalField results, str(float) gives the
+# shortest repr and so the Decimal the user stored.
+DECIMAL_CONVERTERS = {
+    str: Decimal,
+    int: Decimal,
+    float: lambda value: Decimal(str(value)),
+}
+
+BOOLEAN_VALUES = {0: False, 1: True, '0': False, '1': True}
+
 
 class DatabaseOperations(BaseDatabaseOperations):
     """
@@ -175,6 +185,13 @@ END;
         else:
             return cursor.fetchone()
 
+    def fetch_returned_insert_rows(self, cursor):
+        """
+        Given a cursor object that has just performed an INSERT...RETURNING
+        statement for several rows, return the list of returned rows.
+        """
+        return list(cursor.cursor.returned_rows)
+
     if django.VERSION>=(4,1):
         def date_trunc_sql(self, lookup_type, sql, params, tzname=None):
             sql, params = self._convert_sql_to_tz(sql, params, tzname)
@@ -472,6 +489,22 @@ END;
             ('FETCH FIRST %d ROWS ONLY' % fetch) if fetch else None,
         ) if sql)    
 
+    def approximate_fetch_sql(self, fetch, accuracy=None, ef_search=None, probes=None):
+        """
+        Return the FETCH clause of an approximate nearest neighbour search
+        through a vector index, ef_search tuning HNSW and probes IVF indexes.
+        """
+        sql = 'FETCH APPROX FIRST %d ROWS ONLY' % fetch
+        if len([value for value in (accuracy, ef_search, probes) if value is not None]) > 1:
+            raise ValueError("Only one of accuracy, ef_search and probes can be given")
+        if accuracy is not None:
+            sql += ' WITH TARGET ACCURACY %d' % accuracy
+        elif ef_search is not None:
+            sql += ' WITH TARGET ACCURACY PARAMETERS (EFS %d)' % ef_search
+        elif probes is not None:
+            sql += ' WITH TARGET ACCURACY PARAMETERS (NEIGHBOR PARTITION PROBES %d)' % probes
+        return sql
+
     def pk_default_value(self):
         """
         Returns the value to use during an INSERT statement to specify that
@@ -488,10 +521,20 @@ END;
             return ''
         
         if isinstance(value, Database.LOB):
-            value = force_str(value.read())
+            value = force_str(self.read_lob(value))
         
         return value
 
+    def read_lob(self, value):
+        """
+        Read the content of a Database.LOB locator. Every read is an extra
+        round trip, they are counted in connection.lob_reads and, for the
+        last executed query, connection.query_lob_reads.
+        """
+        self.connection.lob_reads += 1
+        self.connection.query_lob_reads += 1
+        return value.read()
+
     def return_insert_id(self):
         """
         For backends that support returning the last insert ID as part
@@ -758,11 +801,16 @@ END;
             return value        
         
         # DAMENG doesn't support tz-aware datetimes
-        if timezone.is_aware(value):
-            if settings.USE_TZ:
-                value = timezone.make_naive(value, self.connection.timezone)
-            else:
+        tzinfo = value.tzinfo
+        if tzinfo is not None and tzinfo.utcoffset(value) is not None:
+            if not settings.USE_TZ:
                 raise ValueError("Dameng backend does not support timezone-aware datetimes when USE_TZ is False.")
+            # timezone.make_naive() without its checks, values already in
+            # the connection timezone only lose their tzinfo.
+            connection_tz = self.connection.timezone
+            if tzinfo is not connection_tz:
+                value = value.astimezone(connection_tz)
+            value = value.replace(tzinfo=None)
 
         return value
 
@@ -793,14 +841,18 @@ END;
         """
         converters = super(DatabaseOperations, self).get_db_converters(expression)
         internal_type = expression.output_field.get_internal_type()
-        if internal_type in ['JSONField', 'TextField']:
+        if getattr(expression.output_field, 'stream_lob', False):
+            # Streaming LOB fields read the locator themselves.
+            pass
+        elif internal_type in ['JSONField', 'TextField']:
             converters.append(self.convert_textfield_value)
         elif internal_type == 'BinaryField':
             converters.append(self.convert_binaryfield_value)
         elif internal_type in ['BooleanField', 'NullBooleanField']:
             converters.append(self.convert_booleanfield_value)
         elif internal_type == 'DateTimeField':
-            converters.append(self.convert_datetimefield_value)
+            if settings.USE_TZ:
+                converters.append(self.get_datetimefield_converter())
         elif internal_type == 'DateField':
             converters.append(self.convert_datefield_value)
         elif internal_type == 'TimeField':
@@ -813,33 +865,43 @@ END;
     
     # convert function
     def convert_decimalfield_value(self, value, expression, connection):
-        if isinstance(value, str):
-            return Decimal(value)
-        if isinstance(value, int) or isinstance(value, float):
-            return Decimal('%s' % (value))
-        return value
+        convert = DECIMAL_CONVERTERS.get(type(value))
+        if convert is None:
+            return value
+        return convert(value)
     
     def convert_textfield_value(self, value, expression, connection):
         if isinstance(value, Database.LOB):
-            value = force_str(value.read())
+            value = force_str(self.read_lob(value))
         return value
 
     def convert_binaryfield_value(self, value, expression, connection):
         if isinstance(value, Database.LOB):
-            value = force_bytes(value.read())
+            value = force_bytes(self.read_lob(value))
         return value
 
     def convert_booleanfield_value(self, value, expression, connection):
-        if value in (0, 1):
-            value = bool(value)
-        if value in ('0', '1'):
-            value = bool(int(value))
-        return value
+        return BOOLEAN_VALUES.get(value, value)
+
+    def get_datetimefield_converter(self):
+        """
+        Return the DateTimeField converter for the connection timezone. A
+        timezone with a fixed UTC offset, UTC in particular, is attached to
+        the values directly instead of going through timezone.make_aware().
+        """
+        connection_tz = self.connection.timezone
+        if connection_tz.utcoffset(None) is None:
+            return self.convert_datetimefield_value
+
+        def convert_fixed_offset_datetimefield_value(value, expression, connection):
+            if value is not None:
+                value = value.replace(tzinfo=connection_tz)
+            return value
+        return convert_fixed_offset_datetimefield_value
 
     def convert_datetimefield_value(self, value, expression, connection):
         if value is not None:
-            if settings.USE_TZ:
-                value = timezone.make_aware(value, self.connection.timezone)
+            value = timezone.make_aware(value, self.connection.timezone)
         return value
 
     def convert_datefield_value(self, value, expression, connection):
@@ -876,6 +938,38 @@ END;
         return '%s_TR' % truncate_name(table, name_length).upper()            
     
     
+    def bulk_batch_size(self, fields, objs):
+        """
+        Return the maximum allowed batch size for the backend. The fields
+        are the fields going to be inserted in the batch, the objs contains
+        all the objects to be inserted.
+
+        Rows are array bound with executemany() where possible, so a batch is
+        bounded by the number of values bound in one call rather than by the
+        SQL text, wide rows get smaller batches.
+        """
+        if not fields:
+            return len(objs)
+        return max(self.connection.features.max_query_params // len(fields), 1)
+
+    def bulk_update_merge_sql(self, table, pk_column, columns):
+        """
+        Return the MERGE statement used by QuerySet.bulk_update(). The source
+        is a single (pk, value, ...) row, bound to a whole batch of objects
+        with executemany(), instead of one CASE WHEN per object and field.
+        """
+        table = self.quote_name(table)
+        source = self.quote_name('dm_source')
+        pk_column = self.quote_name(pk_column)
+        columns = [self.quote_name(column) for column in columns]
+        return 'MERGE INTO %s USING (SELECT %s FROM DUAL) %s ON (%s.%s = %s.%s) WHEN MATCHED THEN UPDATE SET %s' % (
+            table,
+            ', '.join('%%s %s' % column for column in [pk_column] + columns),
+            source,
+            table, pk_column, source, pk_column,
+            ', '.join('%s.%s = %s.%s' % (table, column, source, column) for column in columns),
+        )
+
     def bulk_insert_sql(self, fields, placeholder_rows):
         return " UNION ALL ".join(
             "SELECT %s FROM DUAL" % ", ".join(row)
@@ -0,0 +1,277 @@
+"""
+Process-wide connection pool for the Dameng backend.
+
+The pool does not import dmPython itself: connections are opened through the
+``connect`` callable handed to the pool, so it can be driven by any DB-API
+style module.
+"""
+import atexit
+import os
+import threading
+import time
+
+
+class PoolTimeout(Exception):
+    """
+    Raised when no connection could be acquired within the pool timeout.
+    """
+    pass
+
+
+def reset_connection(connection):
+    """
+    Reset the session state of a connection that is handed back to the pool.
+    """
+    connection.rollback()
+
+
+class ConnectionPool(object):
+    """
+    A bounded pool of DB-API connections.
+
+    Idle connections are handed out most recently used first. Connections
+    that have been idle for longer than ``max_idle`` seconds or that are
+    older than ``max_lifetime`` seconds are closed instead of being reused,
+    but the pool never prunes idle connections below ``min_size``.
+    """
+
+    def __init__(self, connect, min_size=0, max_size=10, max_idle=None,
+                 max_lifetime=None, timeout=30, reset=reset_connection, name=None):
+        if max_size < 1:
+            raise ValueError("The pool max_size must be at least 1")
+        if min_size < 0 or min_size > max_size:
+            raise ValueError("The pool min_size must be between 0 and max_size")
+
+        self.pid = os.getpid()
+        self.name = name
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self._connect = connect
+        self._reset = reset
+        self._cond = threading.Condition(threading.Lock())
+        # [(connection, created_at, released_at), ...], most recently used last.
+        self._idle = []
+        # id(connection) -> created_at
+        self._in_use = {}
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+
+        self.created = 0
+        self.discarded = 0
+        self.acquired = 0
+        self.timeouts = 0
+        self.wait_time = 0.0
+
+    def _expired(self, created_at, released_at, now):
+        if self.max_lifetime is not None and now - created_at >= self.max_lifetime:
+            return True
+        if self.max_idle is not None and now - released_at >= self.max_idle:
+            return self._size > self.min_size
+        return False
+
+    def _open(self):
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        return conn
+
+    def _discard(self, connections):
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def fill(self):
+        """
+        Open connections until the pool holds at least ``min_size`` of them.
+        """
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            conn = self._open()
+            now = time.monotonic()
+            with self._cond:
+                self.created += 1
+                self._idle.append((conn, now, now))
+                self._cond.notify()
+
+    def acquire(self):
+        """
+        Return a connection from the pool, opening a new one if the pool has
+        not reached ``max_size``. Block for at most ``timeout`` seconds when
+        the pool is exhausted and raise PoolTimeout after that.
+        """
+        start = time.monotonic()
+        deadline = None if self.timeout is None else start + self.timeout
+        expired = []
+        conn = None
+        try:
+            with self._cond:
+                if self._closed:
+                    raise PoolTimeout("The connection pool is closed")
+                while True:
+                    now = time.monotonic()
+                    while self._idle:
+                        candidate, created_at, released_at = self._idle.pop()
+                        if self._expired(created_at, released_at, now):
+                            self._size -= 1
+                            self.discarded += 1
+                            expired.append(candidate)
+                            continue
+                        conn = candidate
+                        self._in_use[id(conn)] = created_at
+                        break
+                    if conn is not None:
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = None if deadline is None else deadline - now
+                    if remaining is not None and remaining <= 0:
+                        self.timeouts += 1
+                        raise PoolTimeout(
+                            "Could not acquire a connection within %s seconds "
+                            "(max_size=%s)" % (self.timeout, self.max_size)
+                        )
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+        finally:
+            self._discard(expired)
+
+        if conn is None:
+            conn = self._open()
+            with self._cond:
+                self.created += 1
+                self._in_use[id(conn)] = time.monotonic()
+
+        with self._cond:
+            self.acquired += 1
+            self.wait_time += time.monotonic() - start
+        return conn
+
+    def release(self, conn, discard=False):
+        """
+        Hand a connection back to the pool. The session is reset first; a
+        connection that fails to reset, is past its lifetime or is released
+        with ``discard=True`` is closed instead of being reused.
+        """
+        with self._cond:
+            created_at = self._in_use.pop(id(conn), None)
+        if created_at is None:
+            # Not one of ours (e.g. opened before the pool was recreated
+            # after a fork), just close it.
+            self._discard([conn])
+            return
+
+        if not discard:
+            try:
+                self._reset(conn)
+            except Exception:
+                discard = True
+
+        now = time.monotonic()
+        if not discard and self.max_lifetime is not None:
+            discard = now - created_at >= self.max_lifetime
+
+        with self._cond:
+            if discard or self._closed:
+                self._size -= 1
+                self.discarded += 1
+            else:
+                self._idle.append((conn, created_at, now))
+                conn = None
+            self._cond.notify()
+
+        if conn is not None:
+            self._discard([conn])
+
+    def close(self):
+        """
+        Close every idle connection. Connections that are in use are closed
+        when they are released.
+        """
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _, _ in self._idle]
+            self._idle = []
+            self._size -= len(idle)
+            self.discarded += len(idle)
+            self._cond.notify_all()
+        self._discard(idle)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'name': self.name,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'waiting': self._waiting,
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'created': self.created,
+                'discarded': self.discarded,
+                'acquired': self.acquired,
+                'timeouts': self.timeouts,
+                'wait_time': self.wait_time,
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key, connect, **options):
+    """
+    Return the process-wide pool registered under ``key``, creating it with
+    ``options`` on first use. Closed pools and pools inherited from a parent
+    process are replaced rather than reused.
+    """
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool.pid != os.getpid() or pool._closed:
+            pool = ConnectionPool(connect, **options)
+            _pools[key] = pool
+            created = True
+        else:
+            created = False
+    if created:
+        pool.fill()
+    return pool
+
+
+def pool_stats():
+    """
+    Return the stats of every pool of the current process. The pools are
+    told apart by their name, the keys are not returned.
+    """
+    pid = os.getpid()
+    with _pools_lock:
+        pools = [pool for pool in _pools.values() if pool.pid == pid]
+    return [pool.stats() for pool in pools]
+
+
+def close_all():
+    pid = os.getpid()
+    with _pools_lock:
+        pools = [pool for pool in _pools.values() if pool.pid == pid]
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(close_all)
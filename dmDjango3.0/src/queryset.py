@@ -0,0 +1,205 @@
+from django.db import connections
+from django.db.models import F, Manager, QuerySet
+from django.db.models.expressions import RawSQL
+from django.db.models.sql.constants import MULTI
+
+
+class DMQuerySet(QuerySet):
+    """
+    QuerySet exposing Dameng specific query hints.
+    """
+
+    def using_fetch_size(self, fetch_size):
+        """
+        Fetch the results of the query fetch_size rows per round trip: the
+        cursor running the query uses it as its arraysize, in place of
+        OPTIONS['arraysize'], and as the iterator() chunk size.
+        """
+        if type(fetch_size) is not int or fetch_size < 1:
+            raise ValueError("The fetch_size must be a positive integer")
+        clone = self._chain()
+        clone.query.fetch_size = fetch_size
+        return clone
+
+    def vector_search(self, accuracy=None, ef_search=None, probes=None):
+        """
+        Run the sliced nearest neighbour query as an approximate search
+        through the vector index: accuracy is the target accuracy in percent,
+        ef_search the HNSW candidate list size and probes the number of IVF
+        partitions searched. Higher values trade latency for recall. Give at
+        most one of them; the query must not have an offset.
+        """
+        if accuracy is not None and (type(accuracy) is not int or not 0 < accuracy <= 100):
+            raise ValueError("The accuracy must be an integer between 1 and 100")
+        for name, value in (('ef_search', ef_search), ('probes', probes)):
+            if value is not None and (type(value) is not int or value < 1):
+                raise ValueError("The %s must be a positive integer" % name)
+        if ef_search is not None and probes is not None:
+            raise ValueError("The ef_search and probes can not be used together")
+        if accuracy is not None and (ef_search is not None or probes is not None):
+            raise ValueError("The accuracy can not be used together with ef_search or probes")
+        clone = self._chain()
+        clone.query.vector_search = {'accuracy': accuracy, 'ef_search': ef_search, 'probes': probes}
+        return clone
+
+    def values_matrix(self, field_name, ids=True, chunk_size=2000):
+        """
+        Return the values of the VectorField field_name as one 2-D numpy
+        array of shape (rows, dim). With ids=True return a (pks, matrix)
+        tuple, pks holding the primary key of every matrix row.
+
+        The rows are fetched chunk_size at a time and every chunk is parsed
+        into the preallocated matrix at once, without building an array per
+        row. Rows where the field is NULL are left out.
+        """
+        import numpy
+        from .vector import VectorField
+        field = self.model._meta.get_field(field_name)
+        if not isinstance(field, VectorField):
+            raise ValueError("%s is not a VectorField" % field_name)
+        dtype = numpy.float32
+        dim = field.dim
+
+        qs = self.filter(**{field_name + '__isnull': False})
+        qs = qs.values_list('pk', field_name) if ids else qs.values_list(field_name)
+        size = qs.count()
+        matrix = numpy.empty((size, dim), dtype=dtype)
+        pks = []
+
+        compiler = qs.query.get_compiler(using=qs.db)
+        # Skip the converters, the vector text is parsed below.
+        results = compiler.execute_sql(MULTI, chunked_fetch=True, chunk_size=chunk_size)
+        start = 0
+        for rows in results:
+            end = start + len(rows)
+            if end > size:
+                # Rows were added since the count, make room for them.
+                size = max(end, size * 2)
+                matrix.resize((size, dim), refcheck=False)
+            text = ','.join([row[-1][1:-1] for row in rows])
+            matrix[start:end] = numpy.fromstring(text, dtype=dtype, sep=',').reshape(len(rows), dim)
+            if ids:
+                pks.extend([row[0] for row in rows])
+            start = end
+        if start < size:
+            matrix.resize((start, dim), refcheck=False)
+        if not ids:
+            return matrix
+
+        converters = compiler.get_converters([compiler.select[0][0]])
+        if converters:
+            pks = [row[0] for row in compiler.apply_converters(([pk] for pk in pks), converters)]
+        return numpy.array(pks), matrix
+
+
+    def knn_batch(self, field_name, vectors, k=10, metric='cosine', batch_size=64):
+        """
+        Run a k nearest neighbour search on the VectorField field_name for
+        every vector of vectors. Return one list of (object, distance) pairs
+        per vector, closest first.
+
+        Up to batch_size searches are sent as a single UNION ALL statement of
+        top-k subqueries instead of one round trip per vector, the vectors
+        being bound parameters.
+        """
+        from .vector import KNN_METRICS
+        if metric not in KNN_METRICS:
+            raise ValueError("The metric must be one of %s" % ', '.join(sorted(KNN_METRICS)))
+        if type(k) is not int or k < 1:
+            raise ValueError("The k must be a positive integer")
+        if type(batch_size) is not int or batch_size < 1:
+            raise ValueError("The batch_size must be a positive integer")
+        distance_func = KNN_METRICS[metric]
+        field = getattr(self.model, field_name)
+        pk_field = self.model._meta.pk
+        connection = connections[self.db]
+        # Rows without a vector have no distance.
+        searched = self.filter(**{field_name + '__isnull': False})
+
+        hits = []
+        for offset in range(0, len(vectors), batch_size):
+            sqls, params = [], []
+            for index, vector in enumerate(vectors[offset:offset + batch_size]):
+                # The search index is a literal, so that every batch of the
+                # same size compiles to the same statement.
+                # Only annotations are selected, in the order they are
+                # declared: values_list() puts model fields before them.
+                qs = searched.annotate(
+                    knn_query=RawSQL(str(index), []),
+                    knn_pk=F('pk'),
+                    knn_distance=distance_func(field, vector),
+                ).order_by('knn_distance', 'pk').values_list('knn_query', 'knn_pk', 'knn_distance')[:k]
+                sql, sql_params = qs.query.get_compiler(using=self.db).as_sql()
+                sqls.append('SELECT * FROM (%s)' % sql)
+                params.extend(sql_params)
+            with connection.cursor() as cursor:
+                cursor.execute(' UNION ALL '.join(sqls), params)
+                hits.extend(
+                    (offset + index, pk_field.to_python(pk), float(distance))
+                    for index, pk, distance in cursor.fetchall()
+                )
+
+        objects = self.in_bulk({pk for _, pk, _ in hits})
+        results = [[] for _ in vectors]
+        for index, pk, distance in sorted(hits, key=lambda hit: (hit[0], hit[2])):
+            if pk in objects:
+                results[index].append((objects[pk], distance))
+        return results
+
+
+    def hybrid_search(self, field_name, vector, k=10, metric='cosine', mode='auto', over_fetch=4,
+                      max_retries=3, prefilter_threshold=10000, **search):
+        """
+        Return the k objects of the queryset closest to vector on the
+        VectorField field_name, their distance in the knn_distance attribute.
+
+        mode='prefilter' ranks all the rows matching the filters exactly.
+        mode='postfilter' takes the k * over_fetch closest rows of the whole
+        table from the vector index and keeps the ones matching the filters,
+        in a single statement. While fewer than k rows remain, it retries with
+        over_fetch times more candidates, max_retries times, then falls back
+        to 'prefilter'. mode='auto' uses 'prefilter' when at most
+        prefilter_threshold rows match the filters and 'postfilter'
+        otherwise. The search keyword arguments go to vector_search() for
+        the candidate query.
+        """
+        from .vector import KNN_METRICS
+        if metric not in KNN_METRICS:
+            raise ValueError("The metric must be one of %s" % ', '.join(sorted(KNN_METRICS)))
+        if mode not in ('auto', 'prefilter', 'postfilter'):
+            raise ValueError("The mode must be one of auto, prefilter, postfilter")
+        if type(k) is not int or k < 1:
+            raise ValueError("The k must be a positive integer")
+        if type(over_fetch) is not int or over_fetch < 2:
+            raise ValueError("The over_fetch must be an integer greater than 1")
+        if type(max_retries) is not int or max_retries < 0:
+            raise ValueError("The max_retries must be a non-negative integer")
+        distance = KNN_METRICS[metric](getattr(self.model, field_name), vector)
+        # Rows without a vector have no distance.
+        searched = self.filter(**{field_name + '__isnull': False})
+        ranked = searched.annotate(knn_distance=distance).order_by('knn_distance', 'pk')
+
+        if mode == 'auto':
+            mode = 'prefilter' if searched.count() <= prefilter_threshold else 'postfilter'
+        if mode == 'postfilter':
+            candidates = k * over_fetch
+            for _ in range(max_retries + 1):
+                candidate_qs = DMQuerySet(self.model, using=self.db).filter(
+                    **{field_name + '__isnull': False}
+                ).annotate(
+                    knn_distance=distance,
+                ).order_by('knn_distance').vector_search(**search).values_list('pk', flat=True)[:candidates]
+                # A FETCH clause is not allowed in an IN subquery
+                # (allow_sliced_subqueries_with_in), but it is in a derived
+                # table: select the candidates from the sliced query.
+                sql, params = candidate_qs.query.get_compiler(using=self.db).as_sql()
+                candidate_pks = RawSQL('SELECT * FROM (%s)' % sql, params)
+                results = list(ranked.filter(pk__in=candidate_pks)[:k])
+                if len(results) >= k:
+                    return results
+                candidates *= over_fetch
+        return list(ranked[:k])
+
+
+class DMManager(Manager.from_queryset(DMQuerySet)):
+    pass
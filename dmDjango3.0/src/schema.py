@@ -29,6 +29,27 @@ class DatabaseSchemaEditor(BaseDatabaseSchemaEditor):
 
     sql_create_index = "CREATE INDEX %(name)s ON %(table)s (%(columns)s)%(extra)s"  
 
+    # Set by build_pending_vector_indexes() to build deferred vector indexes.
+    build_deferred_indexes = False
+
+    def _model_indexes_sql(self, model):
+        # Deferred vector indexes compile to None until they are built.
+        return [sql for sql in super()._model_indexes_sql(model) if sql is not None]
+
+    def add_index(self, model, index):
+        if getattr(index, 'deferred', False) and not self.build_deferred_indexes:
+            return None
+        return super().add_index(model, index)
+
+    def remove_index(self, model, index):
+        if getattr(index, 'deferred', False):
+            # A deferred index may never have been built.
+            with self.connection.cursor() as cursor:
+                constraints = self.connection.introspection.get_constraints(cursor, model._meta.db_table)
+            if index.name.upper() not in set(name.upper() for name in constraints):
+                return None
+        return super().remove_index(model, index)
+
     def quote_value(self, value):
         """
         Returns a quoted version of the value so it's safe to use in an SQL
@@ -1,4 +1,6 @@
 import datetime
+import time
+from collections import OrderedDict
 
 from django.utils.encoding import force_bytes
 
@@ -45,4 +47,261 @@ class InsertVar:
         return self.bound_param
 
     def get_value(self):
-        return self.bound_param.getvalue()
\ No newline at end of file
+        return self.bound_param.getvalue()
+
+    def bind_array(self, cursor, size):
+        """
+        Bind an output array receiving the value of every row inserted by
+        executemany().
+        """
+        self.bound_param = cursor.var(self.db_type, arraysize=size)
+        return self.bound_param
+
+    def get_values(self, size):
+        values = []
+        for i in range(size):
+            value = self.bound_param.getvalue(i)
+            # DML returning yields a list of the values returned by each
+            # row of the batch; a single-row INSERT returns one.
+            if isinstance(value, list):
+                value = value[0] if value else None
+            values.append(value)
+        return values
+
+
+class HealthCheck(object):
+    """
+    Rate-limited liveness check of a connection. The probe is skipped when
+    the connection completed a statement less than ``interval`` seconds ago.
+    """
+
+    def __init__(self, interval=0):
+        self.interval = interval
+        self.last_used = None
+        self.probes = 0
+        self.skipped = 0
+        self.failures = 0
+
+    def mark_used(self):
+        self.last_used = time.monotonic()
+
+    def reset(self):
+        self.last_used = None
+
+    def ping(self, connection):
+        """
+        Use the driver-level liveness call when dmPython provides one, and
+        fall back to a round trip otherwise.
+        """
+        ping = getattr(connection, 'ping', None)
+        if ping is not None:
+            ping()
+            return
+        cursor = connection.cursor()
+        try:
+            cursor.execute('select 1 from dual')
+        finally:
+            cursor.close()
+
+    def is_usable(self, connection, force=False):
+        if (not force and self.interval and self.last_used is not None and
+                time.monotonic() - self.last_used < self.interval):
+            self.skipped += 1
+            return True
+
+        self.probes += 1
+        try:
+            self.ping(connection)
+        except Database.Error:
+            self.failures += 1
+            self.last_used = None
+            return False
+        self.mark_used()
+        return True
+
+    def stats(self):
+        return {
+            'interval': self.interval,
+            'probes': self.probes,
+            'skipped': self.skipped,
+            'failures': self.failures,
+        }
+
+
+class LRUCache(object):
+    """
+    A bounded mapping that discards the least recently used entry once it
+    holds more than ``maxsize`` entries. ``on_evict(key, value)`` is called
+    for every entry dropped by the cache.
+    """
+
+    def __init__(self, maxsize=128, on_evict=None):
+        self.maxsize = maxsize
+        self.on_evict = on_evict
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def pop(self, key, default=None):
+        return self._data.pop(key, default)
+
+    def put(self, key, value):
+        if key in self._data:
+            self._data.move_to_end(key)
+        self._data[key] = value
+        self._trim()
+
+    def resize(self, maxsize):
+        self.maxsize = maxsize
+        self._trim()
+
+    def _trim(self):
+        while len(self._data) > max(self.maxsize, 0):
+            key, value = self._data.popitem(last=False)
+            self.evictions += 1
+            if self.on_evict is not None:
+                self.on_evict(key, value)
+
+    def clear(self):
+        while self._data:
+            key, value = self._data.popitem(last=False)
+            if self.on_evict is not None:
+                self.on_evict(key, value)
+
+    def stats(self):
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+class StatementCache(object):
+    """
+    Per-connection cache of prepared cursors keyed by the translated SQL.
+
+    A cursor is checked out of the cache while a CursorWrapper reads from
+    it and checked back in on the wrapper's next statement, so two wrappers
+    never share a result set. Cursors dropped from the cache are closed,
+    which releases their server-side statement handle.
+    """
+
+    def __init__(self, maxsize=0):
+        self._cursors = LRUCache(maxsize, on_evict=self._close_cursor)
+        self.prepared = 0
+        self.reused = 0
+
+    @property
+    def maxsize(self):
+        return self._cursors.maxsize
+
+    def resize(self, maxsize):
+        self._cursors.resize(maxsize)
+
+    def _close_cursor(self, sql, cursor):
+        try:
+            cursor.close()
+        except Database.Error:
+            pass
+
+    def checkout(self, connection, sql, configure=None):
+        """
+        Return the cached prepared cursor of sql or prepare a new cursor,
+        set up by configure(cursor) if given.
+        """
+        cursor = self._cursors.pop(sql)
+        if cursor is not None:
+            self.reused += 1
+            return cursor
+
+        cursor = connection.cursor()
+        if configure is not None:
+            configure(cursor)
+        prepare = getattr(cursor, 'prepare', None)
+        if prepare is not None:
+            prepare(sql)
+        self.prepared += 1
+        return cursor
+
+    def checkin(self, sql, cursor):
+        # Another wrapper may have prepared the same statement while this
+        # cursor was checked out; keep the most recently used one.
+        previous = self._cursors.pop(sql)
+        if previous is not None:
+            self._close_cursor(sql, previous)
+        if self.maxsize:
+            self._cursors.put(sql, cursor)
+        else:
+            self._close_cursor(sql, cursor)
+
+    def discard(self, sql, cursor):
+        self._close_cursor(sql, cursor)
+
+    def clear(self):
+        self._cursors.clear()
+
+    def stats(self):
+        # Cursors are popped on checkout, so the LRU hit and miss counters
+        # stay at zero: prepared and reused are the misses and hits.
+        stats = self._cursors.stats()
+        del stats['hits'], stats['misses']
+        stats.update(prepared=self.prepared, reused=self.reused)
+        return stats
+
+
+class FetchStats(object):
+    """
+    Rows fetched by the cursors of a connection and the round trips they
+    took. The round trips are estimated from the cursor arraysize: the
+    driver fills a buffer of arraysize rows per round trip.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.round_trips = 0
+
+    def record(self, cursor_wrapper, fetched):
+        arraysize = cursor_wrapper.cursor.arraysize or 1
+        missing = fetched - cursor_wrapper._buffered
+        if missing > 0:
+            round_trips = -(-missing // arraysize)
+            cursor_wrapper._buffered = round_trips * arraysize - missing
+            self.round_trips += round_trips
+        else:
+            cursor_wrapper._buffered = -missing
+        self.rows += fetched
+
+    def round_trips_per_row(self):
+        if not self.rows:
+            return 0.0
+        return self.round_trips / self.rows
+
+    def reset(self):
+        self.rows = 0
+        self.round_trips = 0
+
+    def stats(self):
+        return {
+            'rows': self.rows,
+            'round_trips': self.round_trips,
+            'round_trips_per_row': self.round_trips_per_row(),
+        }
@@ -3,6 +3,10 @@ from django import forms
 from django.db.backends.utils import truncate_name
 from django.db.models.expressions import RawSQL
 from django.db.backends.ddl_references import Statement, Columns, Table, IndexName
+import time
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.operations.base import Operation
 from django.db.models import Field, FloatField, Func, Index
 
 MAX_DIM_LENGTH = 65535
@@ -19,7 +23,13 @@ def encode_vector(value, dim=None):
     if isinstance(value, numpy.ndarray):
         if value.ndim != 1:
             raise ValueError("expected ndim to be 1")
-        return f"[{','.join(map(str, value))}]"
+        if value.dtype.kind == 'f' and value.dtype.itemsize < 8:
+            # str() of a float32 component is its shortest float32 repr,
+            # the float64 repr tolist() gives is about twice as long.
+            return f"[{','.join(map(str, value))}]"
+        # tolist() converts every component in C, the text of the list is
+        # the "[a, b, ...]" form TO_VECTOR accepts.
+        return str(value.tolist())
 
     return str(value)
 
@@ -31,7 +41,8 @@ def decode_vector(value: str):
     if value == "[]":
         return numpy.array([], dtype=numpy.float32)
 
-    return numpy.array(value[1:-1].split(","), dtype=numpy.float32)
+    # Parse the components in one pass instead of building a list of strings.
+    return numpy.fromstring(value[1:-1], dtype=numpy.float32, sep=",")
 
 class VectorField(Field):
     description = "Vector"
@@ -130,7 +141,43 @@ class VectorField(Field):
 
         return []
 
-class IvfVectorIndex(Index):
+class VectorIndexMixin:
+    """
+    Build options of the vector indexes. online builds the index without
+    blocking writes to the table and parallel sets the degree of parallelism
+    of the build. A deferred index is left out of migrations and built by
+    build_pending_vector_indexes() once the data is loaded.
+    """
+
+    def _set_build_options(self, online, parallel, deferred):
+        if parallel is not None and (type(parallel) is not int or parallel < 1):
+            raise ValueError("The parallel must be a positive integer")
+        self.online = online
+        self.parallel = parallel
+        self.deferred = deferred
+
+    def build_options_sql(self):
+        sql = ""
+        if self.online:
+            sql += " ONLINE"
+        if self.parallel is not None:
+            sql += " PARALLEL " + str(self.parallel)
+        return sql
+
+    def is_deferred(self, schema_editor):
+        return self.deferred and not getattr(schema_editor, "build_deferred_indexes", False)
+
+    def deconstruct(self):
+        path, args, kwargs = super().deconstruct()
+        if self.online:
+            kwargs["online"] = True
+        if self.parallel is not None:
+            kwargs["parallel"] = self.parallel
+        if self.deferred:
+            kwargs["deferred"] = True
+        return path, args, kwargs
+
+class IvfVectorIndex(VectorIndexMixin, Index):
     def __init__(
         self,
         *expressions,
@@ -139,6 +186,9 @@ class IvfVectorIndex(Index):
         metric_name: str = "COSINE",
         percentage_value: int = 90,
         num_of_partitions: int = None,
+        online: bool = False,
+        parallel: int = None,
+        deferred: bool = False,
         db_tablespace = None,
         opclasses = (),
         condition = None,
@@ -169,6 +219,7 @@ class IvfVectorIndex(Index):
         self._metric_name = metric_name
         self._percentage_value = percentage_value
         self._num_of_partitions = num_of_partitions
+        self._set_build_options(online, parallel, deferred)
 
         super().__init__(*expressions, fields=self.fields, name=self.name, db_tablespace=db_tablespace, opclasses = opclasses,
         condition = condition, **kwargs)
@@ -181,6 +232,8 @@ class IvfVectorIndex(Index):
         return name.upper()
 
     def create_sql(self, model, schema_editor, using="", **kwargs):
+        if self.is_deferred(schema_editor):
+            return None
         table = model._meta.db_table
         fields = [
             model._meta.get_field(field_name)
@@ -192,7 +245,8 @@ class IvfVectorIndex(Index):
             "DISTANCE %(metric_name)s WITH TARGET ACCURACY %(percentage_value)s"
 
         if self._num_of_partitions is not None:
-            sql_template += "PARAMETERS(TYPE IVF, NEIGHBOR PARTITIONS " + str(self._num_of_partitions) + ");"
+            sql_template += " PARAMETERS(TYPE IVF, NEIGHBOR PARTITIONS " + str(self._num_of_partitions) + ")"
+        sql_template += self.build_options_sql()
 
         columns=(Columns(table, columns, self.quote_name, col_suffixes=()))
 
@@ -210,7 +264,7 @@ class IvfVectorIndex(Index):
             **kwargs,
         )
 
-class HnswVectorIndex(Index):
+class HnswVectorIndex(VectorIndexMixin, Index):
 
     def __init__(
         self,
@@ -222,6 +276,9 @@ class HnswVectorIndex(Index):
         percentage_value: int = 90,
         max_connection: int = None,
         ef_construction: int = None,
+        online: bool = False,
+        parallel: int = None,
+        deferred: bool = False,
         db_tablespace = None,
         opclasses = (),
         condition = None,
@@ -254,6 +311,7 @@ class HnswVectorIndex(Index):
         self._percentage_value = percentage_value
         self._max_connection = max_connection
         self._ef_construction = ef_construction
+        self._set_build_options(online, parallel, deferred)
 
         super().__init__(*expressions, fields=self.fields, name=self.name, db_tablespace=db_tablespace, opclasses = opclasses,
         condition = condition, include = include)
@@ -266,6 +324,8 @@ class HnswVectorIndex(Index):
         return name.upper()
 
     def create_sql(self, model, schema_editor, using="", **kwargs):
+        if self.is_deferred(schema_editor):
+            return None
         table = model._meta.db_table
         fields = [
             model._meta.get_field(field_name)
@@ -278,13 +338,14 @@ class HnswVectorIndex(Index):
 
         if self._max_connection is not None or self._ef_construction is not None:
             if self._max_connection is not None:
-                sql_template += "PARAMETERS(TYPE HNSW, NEIGHBOR " + str(self._max_connection)
+                sql_template += " PARAMETERS(TYPE HNSW, NEIGHBOR " + str(self._max_connection)
                 if self._ef_construction is not None:
-                    sql_template += ", EFCONSTRUCTION " + str(self._ef_construction) + ");"
+                    sql_template += ", EFCONSTRUCTION " + str(self._ef_construction) + ")"
                 else:
-                    sql_template += ");"
+                    sql_template += ")"
             else:
-                sql_template += "PARAMETERS(TYPE HNSW, EFCONSTRUCTION " + str(self._ef_construction) + ");"
+                sql_template += " PARAMETERS(TYPE HNSW, EFCONSTRUCTION " + str(self._ef_construction) + ")"
+        sql_template += self.build_options_sql()
 
         columns=(Columns(table, columns, self.quote_name, col_suffixes=()))
 
@@ -302,6 +363,130 @@ class HnswVectorIndex(Index):
             **kwargs,
         )
 
+def pending_vector_indexes(using=DEFAULT_DB_ALIAS):
+    """
+    Return the (model, index) pairs of the deferred vector indexes that do
+    not exist in the database yet.
+    """
+    from django.apps import apps
+    connection = connections[using]
+    pending = []
+    with connection.cursor() as cursor:
+        tables = set(name.upper() for name in connection.introspection.table_names(cursor))
+        for model in apps.get_models():
+            indexes = [
+                index for index in model._meta.indexes
+                if isinstance(index, VectorIndexMixin) and index.deferred
+            ]
+            if not indexes or model._meta.db_table.upper() not in tables:
+                continue
+            existing = set(
+                name.upper() for name in
+                connection.introspection.get_constraints(cursor, model._meta.db_table)
+            )
+            pending.extend((model, index) for index in indexes if index.name.upper() not in existing)
+    return pending
+
+def build_pending_vector_indexes(using=DEFAULT_DB_ALIAS, progress=None):
+    """
+    Build the deferred vector indexes that do not exist yet, typically after
+    the initial data load. progress, if given, is called after each index
+    with the number of indexes built, their total, the model, the index and
+    the build time in seconds. Return the built (model, index) pairs.
+    """
+    pending = pending_vector_indexes(using)
+    with connections[using].schema_editor() as schema_editor:
+        schema_editor.build_deferred_indexes = True
+        for built, (model, index) in enumerate(pending, 1):
+            start = time.monotonic()
+            schema_editor.add_index(model, index)
+            if progress is not None:
+                progress(built, len(pending), model, index, time.monotonic() - start)
+    return pending
+
+class BuildDeferredVectorIndex(Operation):
+    """
+    Migration operation building the deferred vector index name of a model.
+    """
+    reduces_to_sql = True
+    reversible = True
+
+    def __init__(self, model_name, name):
+        self.model_name = model_name
+        self.name = name
+
+    def deconstruct(self):
+        return self.__class__.__name__, [], {"model_name": self.model_name, "name": self.name}
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def _get_index(self, model):
+        for index in model._meta.indexes:
+            if index.name == self.name:
+                return index
+        raise ValueError("No index named %s on %s" % (self.name, model._meta.label))
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.build_deferred_indexes = True
+            try:
+                schema_editor.add_index(model, self._get_index(model))
+            finally:
+                schema_editor.build_deferred_indexes = False
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.remove_index(model, self._get_index(model))
+
+    def describe(self):
+        return "Build deferred vector index %s on %s" % (self.name, self.model_name)
+
+class RebuildVectorIndex(Operation):
+    """
+    Migration operation rebuilding the vector index name of a model, online
+    so that the table stays writable and with the given parallelism.
+    """
+    reduces_to_sql = True
+    reversible = True
+
+    def __init__(self, model_name, name, online=True, parallel=None):
+        if parallel is not None and (type(parallel) is not int or parallel < 1):
+            raise ValueError("The parallel must be a positive integer")
+        self.model_name = model_name
+        self.name = name
+        self.online = online
+        self.parallel = parallel
+
+    def deconstruct(self):
+        kwargs = {"model_name": self.model_name, "name": self.name}
+        if not self.online:
+            kwargs["online"] = False
+        if self.parallel is not None:
+            kwargs["parallel"] = self.parallel
+        return self.__class__.__name__, [], kwargs
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            sql = "ALTER INDEX " + schema_editor.quote_name(self.name) + " REBUILD"
+            if self.online:
+                sql += " ONLINE"
+            if self.parallel is not None:
+                sql += " PARALLEL " + str(self.parallel)
+            schema_editor.execute(sql)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        pass
+
+    def describe(self):
+        return "Rebuild vector index %s on %s" % (self.name, self.model_name)
+
 class distance_func(Func):
     output_field = FloatField()
 
@@ -313,10 +498,11 @@ class distance_func(Func):
             )
         expressions = [expression.field.column]
         if vector is not None:
-            formatted_other = encode_vector(vector)
-            with_sign_str = "TO_VECTOR(\'" + formatted_other + "\', " + str(
-                expression.field.dim) + ", " + expression.field.format + ")"
-            vector = RawSQL(with_sign_str, [])
+            # Bind the vector, only the checked dimension and format are
+            # part of the SQL, so every search shares one statement.
+            with_sign_str = "TO_VECTOR(%s, " + str(
+                expression.field.dim) + ", " + (expression.field.format or "FLOAT32") + ")"
+            vector = RawSQL(with_sign_str, [encode_vector(vector)])
             expressions.append(vector)
         super().__init__(*expressions, **extra)
 
@@ -338,6 +524,15 @@ class inner_product(distance_func):
 class inner_product_negative(distance_func):
     function = "INNER_PRODUCT_NEGATIVE"
 
+# Distance functions of DMQuerySet.knn_batch(), closest first.
+KNN_METRICS = {
+    'l1': l1_distance,
+    'l2': l2_distance,
+    'cosine': cosine_distance,
+    'hamming': hamming_distance,
+    'inner_product': inner_product_negative,
+}
+
 class VectorWidget(forms.TextInput):
     def format_value(self, value):
         import numpy
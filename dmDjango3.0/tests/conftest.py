@@ -0,0 +1,64 @@
+import importlib.util
+import os
+import sys
+
+import django
+import pytest
+from django.conf import settings
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(os.path.dirname(HERE), 'src')
+
+sys.path.insert(0, HERE)
+import fake_dmpython  # noqa: E402
+
+# The backend is installed as the dmDjango package, which imports dmPython.
+sys.modules['dmPython'] = fake_dmpython
+spec = importlib.util.spec_from_file_location(
+    'dmDjango', os.path.join(SRC, '__init__.py'), submodule_search_locations=[SRC],
+)
+module = importlib.util.module_from_spec(spec)
+sys.modules['dmDjango'] = module
+spec.loader.exec_module(module)
+
+settings.configure(
+    DATABASES={
+        'default': {
+            'ENGINE': 'dmDjango',
+            'NAME': 'test',
+            'USER': 'SYSDBA',
+            'PASSWORD': 'SYSDBA',
+            'HOST': 'localhost',
+            'PORT': '5236',
+            'OPTIONS': {},
+        },
+    },
+    INSTALLED_APPS=['testapp'],
+    USE_TZ=True,
+    TIME_ZONE='UTC',
+    DEFAULT_AUTO_FIELD='django.db.models.AutoField',
+)
+django.setup()
+
+
+def make_connection(**options):
+    """
+    Return a new, unconnected DatabaseWrapper using the given OPTIONS.
+    """
+    from django.db import connection
+    from dmDjango.base import DatabaseWrapper
+    settings_dict = dict(connection.settings_dict, OPTIONS=options)
+    return DatabaseWrapper(settings_dict, alias='test_%d' % id(options))
+
+
+@pytest.fixture
+def fake():
+    """
+    The fake driver connection of the default database, with an empty log.
+    """
+    from django.db import connection
+    connection.ensure_connection()
+    fake = connection.connection
+    fake.log.clear()
+    yield fake
+    fake.responder = fake_dmpython._no_rows
@@ -0,0 +1,228 @@
+"""
+In-memory stand-in for the dmPython driver.
+
+Connections record every statement they run. The rows of a query come from
+the ``responder`` of the connection: a callable taking the SQL text and the
+parameters, returning a list (or iterator) of rows, or None for no result.
+"""
+import datetime
+import itertools
+
+apilevel = '2.0'
+threadsafety = 1
+paramstyle = 'qmark'
+
+
+class Warning(Exception):
+    pass
+
+
+class Error(Exception):
+    pass
+
+
+class InterfaceError(Error):
+    pass
+
+
+class DatabaseError(Error):
+    pass
+
+
+class DataError(DatabaseError):
+    pass
+
+
+class OperationalError(DatabaseError):
+    pass
+
+
+class IntegrityError(DatabaseError):
+    pass
+
+
+class InternalError(DatabaseError):
+    pass
+
+
+class ProgrammingError(DatabaseError):
+    pass
+
+
+class NotSupportedError(DatabaseError):
+    pass
+
+
+class _Type:
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return self.name
+
+
+DATE = _Type('DATE')
+TIME = _Type('TIME')
+TIMESTAMP = _Type('TIMESTAMP')
+NUMBER = _Type('NUMBER')
+BIGINT = _Type('BIGINT')
+ROWID = _Type('ROWID')
+DOUBLE = _Type('DOUBLE')
+REAL = _Type('REAL')
+DECIMAL = _Type('DECIMAL')
+STRING = _Type('STRING')
+FIXED_STRING = _Type('FIXED_STRING')
+BOOLEAN = _Type('BOOLEAN')
+BLOB = _Type('BLOB')
+CLOB = _Type('CLOB')
+INTERVAL = _Type('INTERVAL')
+
+Timestamp = datetime.datetime
+Date = datetime.date
+Binary = bytes
+
+
+class LOB:
+    def __init__(self, data):
+        self.data = data
+        self.reads = 0
+        self.writes = []
+
+    def size(self):
+        return len(self.data)
+
+    def read(self, offset=1, amount=None):
+        self.reads += 1
+        if amount is None:
+            return self.data[offset - 1:]
+        return self.data[offset - 1:offset - 1 + amount]
+
+    def write(self, data, offset=1):
+        self.writes.append((offset, len(data)))
+        self.data = self.data[:offset - 1] + data + self.data[offset - 1 + len(data):]
+
+
+class Var:
+    def __init__(self, type, arraysize=1):
+        self.type = type
+        self.values = [None] * arraysize
+
+    def setvalue(self, pos, value):
+        self.values[pos] = value
+
+    def getvalue(self, pos=0):
+        return self.values[pos]
+
+
+class Cursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.arraysize = 100
+        self.outputsize = None
+        self.rowcount = -1
+        self.description = None
+        self.closed = False
+        self._rows = iter(())
+
+    def setoutputsize(self, size, column=None):
+        self.outputsize = size
+
+    def var(self, type, arraysize=1):
+        return Var(type, arraysize)
+
+    def prepare(self, sql):
+        self.connection.prepared.append(sql)
+
+    def _result(self, sql, params):
+        result = self.connection.responder(sql, params, self)
+        if result is None:
+            self._rows = iter(())
+            self.description = None
+            self.rowcount = 1
+        else:
+            self._rows = iter(result)
+            self.description = [('COL',)]
+            self.rowcount = -1
+
+    def execute(self, sql, params=None):
+        if self.closed:
+            raise InterfaceError("Cursor Not Open")
+        self.connection.log.append((sql, params, self))
+        self._result(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        seq_of_params = list(seq_of_params)
+        self.connection.log.append((sql, seq_of_params, self))
+        for row_number, params in enumerate(seq_of_params):
+            for value in params:
+                if isinstance(value, Var):
+                    value.setvalue(row_number, self.connection.next_id())
+        self.rowcount = len(seq_of_params)
+        self._rows = iter(())
+
+    def fetchone(self):
+        return next(self._rows, None)
+
+    def fetchmany(self, size=None):
+        self.connection.round_trips += 1
+        return list(itertools.islice(self._rows, size or self.arraysize))
+
+    def fetchall(self):
+        self.connection.round_trips += 1
+        return list(self._rows)
+
+    def __iter__(self):
+        return self._rows
+
+    def close(self):
+        self.closed = True
+
+
+def _no_rows(sql, params, cursor):
+    return None
+
+
+class Connection:
+    server_version = '8.1.3.62'
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.log = []
+        self.prepared = []
+        self.cursors = []
+        self.responder = _no_rows
+        self.autoCommit = True
+        self.closed = False
+        self.rollbacks = 0
+        self.pings = 0
+        self.round_trips = 0
+        self._ids = itertools.count(1)
+
+    def next_id(self):
+        return next(self._ids)
+
+    def cursor(self):
+        cursor = Cursor(self)
+        self.cursors.append(cursor)
+        return cursor
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def ping(self):
+        self.pings += 1
+
+    def close(self):
+        self.closed = True
+
+
+connections = []
+
+
+def connect(**kwargs):
+    connection = Connection(**kwargs)
+    connections.append(connection)
+    return connection
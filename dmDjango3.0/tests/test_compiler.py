@@ -0,0 +1,78 @@
+from django.db import connection
+from django.db.models import Case, Value, When
+from django.db.models.functions import Upper
+from django.db.models.sql import InsertQuery
+from testapp.models import Item
+
+
+def test_bulk_statements_are_built_lazily_within_max_query_params(monkeypatch):
+    monkeypatch.setattr(connection.features, 'max_query_params', 4)
+    # Rows compiling to different SQL can't share one array-bound statement.
+    items = [Item(name=Upper(Value('item')) if pk % 2 else 'item') for pk in range(1, 6)]
+    query = InsertQuery(Item)
+    query.insert_values([Item._meta.get_field('name')], items)
+
+    statements = query.get_compiler(connection=connection)._bulk_statements()
+
+    assert not isinstance(statements, list)
+    statements = list(statements)
+    assert [len(params) for sql, params in statements] == [4, 1]
+    assert statements[1] == ('INSERT INTO "TESTAPP_ITEM" ("NAME") SELECT UPPER(%s) FROM DUAL', ('item',))
+
+
+def test_bulk_create_returns_ids_in_one_round_trip(fake):
+    items = Item.objects.bulk_create([Item(name='a'), Item(name='b'), Item(name='c')])
+
+    assert [item.pk for item in items] == [1, 2, 3]
+    assert len(fake.log) == 1
+    sql, param_rows, _ = fake.log[0]
+    assert sql == 'INSERT INTO "TESTAPP_ITEM" ("NAME", "TENANT", "EMBEDDING") VALUES (?, ?, ?) RETURNING "TESTAPP_ITEM"."ID" INTO ?'
+    assert [row[:3] for row in param_rows] == [['a', 0, None], ['b', 0, None], ['c', 0, None]]
+
+
+def test_update_conflicts_run_one_merge_for_every_row(fake):
+    Item.objects.bulk_create(
+        [Item(pk=1, name='a'), Item(pk=2, name='b')],
+        update_conflicts=True, unique_fields=['pk'], update_fields=['name'],
+    )
+
+    statements = [sql for sql, _, _ in fake.log]
+    assert statements[0] == 'SET IDENTITY_INSERT "TESTAPP_ITEM" ON WITH REPLACE NULL'
+    assert statements[-1] == 'SET IDENTITY_INSERT "TESTAPP_ITEM" OFF'
+    sql, param_rows, _ = fake.log[1]
+    assert sql == (
+        'MERGE INTO "TESTAPP_ITEM" USING (SELECT ? "ID", ? "NAME", ? "TENANT", ? "EMBEDDING" FROM DUAL) "DM_SOURCE" '
+        'ON (("TESTAPP_ITEM"."ID" = "DM_SOURCE"."ID")) '
+        'WHEN MATCHED THEN UPDATE SET "TESTAPP_ITEM"."NAME" = "DM_SOURCE"."NAME" '
+        'WHEN NOT MATCHED THEN INSERT ("ID", "NAME", "TENANT", "EMBEDDING") '
+        'VALUES ("DM_SOURCE"."ID", "DM_SOURCE"."NAME", "DM_SOURCE"."TENANT", "DM_SOURCE"."EMBEDDING")'
+    )
+    assert param_rows == [[1, 'a', 0, None], [2, 'b', 0, None]]
+
+
+def test_ignore_conflicts_without_a_unique_key_insert_every_row(fake):
+    Item.objects.bulk_create([Item(name='a'), Item(name='b')], ignore_conflicts=True)
+
+    sql, param_rows, _ = fake.log[0]
+    assert sql == 'INSERT INTO "TESTAPP_ITEM" ("NAME", "TENANT", "EMBEDDING") VALUES (?, ?, ?)'
+    assert [list(row) for row in param_rows] == [['a', 0, None], ['b', 0, None]]
+
+
+def test_bulk_update_runs_one_merge(fake):
+    Item.objects.bulk_update([Item(pk=1, name='a'), Item(pk=2, name='b')], ['name'])
+
+    assert len(fake.log) == 1
+    sql, param_rows, _ = fake.log[0]
+    assert sql.startswith('MERGE INTO "TESTAPP_ITEM"')
+    assert param_rows == [[1, 'a'], [2, 'b']]
+
+
+def test_case_updates_not_covering_every_row_are_not_merged(fake):
+    fake.responder = lambda sql, params, cursor: None
+    Item.objects.filter(pk__in=[1, 2, 3]).update(
+        name=Case(When(pk=1, then=Value('a')), default=Value('z')),
+    )
+    Item.objects.filter(pk__in=[1, 2, 3]).update(name=Case(When(pk=1, then=Value('a'))))
+
+    assert [sql.split(' ', 1)[0] for sql, _, _ in fake.log] == ['UPDATE', 'UPDATE']
+    assert 'ELSE' in fake.log[0][0]
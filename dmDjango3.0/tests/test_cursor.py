@@ -0,0 +1,135 @@
+import tracemalloc
+
+import fake_dmpython
+import pytest
+from conftest import make_connection
+from testapp.models import Document
+
+
+def _lobs_inline_up_to_outputsize(sql, params, cursor):
+    # The LOB probe of init_connection_state().
+    if 'CLOB' in sql:
+        value = 'x'
+        return [(value if cursor.outputsize and len(value) <= cursor.outputsize else fake_dmpython.LOB(value),)]
+
+
+@pytest.fixture
+def lob_prefetch(monkeypatch):
+    """
+    Check the lob_prefetch_size support again, with a driver honouring
+    setoutputsize() unless the test changes the responder.
+    """
+    from dmDjango import base
+    monkeypatch.setattr(base, '_lob_prefetch_supported', None)
+    monkeypatch.setattr(fake_dmpython, '_no_rows', _lobs_inline_up_to_outputsize)
+    return base
+
+
+def test_fetch_options_apply_to_statement_cache_cursors(lob_prefetch):
+    connection = make_connection(arraysize=500, statement_cache_size=8, lob_prefetch_size=4000)
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1 FROM DUAL WHERE 1 = %s', [1])
+    fake = connection.connection
+    sql, params, driver_cursor = fake.log[-1]
+    assert sql == 'SELECT 1 FROM DUAL WHERE 1 = ?'
+    # The statement ran on a prepared cursor of the statement cache.
+    assert fake.prepared == [sql]
+    assert driver_cursor.arraysize == 500
+    assert driver_cursor.outputsize == 4000
+    connection.close()
+
+
+def test_statement_cache_counts_prepares_and_reuses():
+    connection = make_connection(statement_cache_size=8)
+    with connection.cursor() as cursor:
+        for _ in range(3):
+            cursor.execute('SELECT 1 FROM DUAL WHERE 1 = %s', [1])
+    stats = connection.statement_cache.stats()
+    assert stats['prepared'] == 1
+    assert stats['reused'] == 2
+    assert 'hits' not in stats and 'misses' not in stats
+    connection.close()
+
+
+def _documents(count, size):
+    for pk in range(1, count + 1):
+        yield (pk, 'x' * size, None, None)
+
+
+def test_iterator_streams_rows_a_chunk_at_a_time(fake):
+    from django.db import connection
+    connection.statement_cache.resize(8)
+    fake.responder = lambda sql, params, cursor: _documents(5000, 4000)
+    try:
+        tracemalloc.start()
+        count = 0
+        for document in Document.objects.iterator(chunk_size=100):
+            count += 1
+        _, streamed_peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        documents = list(Document.objects.all())
+        _, list_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        connection.statement_cache.resize(0)
+
+    assert count == len(documents) == 5000
+    # 5000 rows of 4 kB: the iterator holds one chunk of 100 rows.
+    assert streamed_peak < 2 * 1024 * 1024 < 16 * 1024 * 1024 < list_peak
+    # The streaming cursor stays out of the statement cache.
+    streamed_cursor = fake.log[0][2]
+    assert streamed_cursor.arraysize == 100
+    assert fake.prepared == [fake.log[1][0]]
+
+
+def test_lob_prefetch_is_checked_once_against_the_driver(lob_prefetch):
+    connection = make_connection(lob_prefetch_size=4000)
+    connection.ensure_connection()
+    assert lob_prefetch._lob_prefetch_supported is True
+    assert connection.lob_prefetch_size == 4000
+    probe, _, probe_cursor = connection.connection.log[0]
+    assert probe == "SELECT CAST('x' AS CLOB) FROM DUAL"
+    assert probe_cursor.closed
+    connection.close()
+
+    connection = make_connection(lob_prefetch_size=4000)
+    connection.ensure_connection()
+    assert connection.connection.log == []
+    connection.close()
+
+
+def test_lob_prefetch_is_disabled_when_the_driver_ignores_it(lob_prefetch, monkeypatch):
+    monkeypatch.setattr(fake_dmpython.Cursor, 'setoutputsize', lambda self, size, column=None: None)
+    connection = make_connection(lob_prefetch_size=4000)
+    with pytest.warns(RuntimeWarning, match='setoutputsize'):
+        connection.ensure_connection()
+    assert lob_prefetch._lob_prefetch_supported is False
+    assert connection.lob_prefetch_size is None
+    with connection.cursor() as cursor:
+        assert cursor.cursor.outputsize is None
+    connection.close()
+
+
+@pytest.mark.parametrize('arraysize', [50, 5000])
+def test_fetch_size_sets_the_arraysize_of_each_statement(fake, monkeypatch, arraysize):
+    from django.db import connection
+    from testapp.models import Item
+    monkeypatch.setattr(connection, 'arraysize', arraysize)
+    connection.statement_cache.resize(8)
+    executed = []
+
+    def responder(sql, params, cursor):
+        executed.append((cursor, cursor.arraysize))
+        return []
+    fake.responder = responder
+    try:
+        list(Item.objects.filter(tenant=1).using_fetch_size(100))
+        list(Item.objects.filter(tenant=1))
+        list(Item.objects.filter(tenant=1).using_fetch_size(100))
+    finally:
+        connection.statement_cache.resize(0)
+
+    # All three ran on the same prepared cursor, with the arraysize of the
+    # query: fetchmany(100) doesn't change it for the next statement.
+    assert len({cursor for cursor, _ in executed}) == 1
+    assert [size for _, size in executed] == [100, arraysize, 100]
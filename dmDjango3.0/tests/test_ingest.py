@@ -0,0 +1,76 @@
+import numpy
+import pytest
+
+import fake_dmpython
+from dmDjango import HnswVectorIndex, ingest_vectors
+from testapp.models import Item
+
+
+def index_statements(fake):
+    return [sql for sql, _, _ in fake.log if 'INDEX' in sql]
+
+
+def test_indexes_are_kept_by_default(fake):
+    stats = ingest_vectors(Item, 'embedding', numpy.eye(3, dtype=numpy.float32), chunk_size=2)
+
+    assert stats['rows'] == 3
+    assert index_statements(fake) == []
+    inserts = [params for sql, params, _ in fake.log if sql.startswith('INSERT')]
+    assert [len(params) for params in inserts] == [2, 1]
+    assert inserts[0][0] == ('[1.0,0.0,0.0]',)
+
+
+def test_failed_index_rebuild_does_not_hide_the_load_error(fake):
+    def responder(sql, params, cursor):
+        if sql.startswith('CREATE'):
+            raise fake_dmpython.DatabaseError('index rebuild failed')
+    fake.responder = responder
+
+    def progress(loaded, total, rate):
+        raise KeyboardInterrupt
+
+    with pytest.warns(RuntimeWarning, match='index rebuild failed'):
+        with pytest.raises(KeyboardInterrupt):
+            ingest_vectors(Item, 'embedding', numpy.eye(3), defer_indexes=True, progress=progress)
+    statements = index_statements(fake)
+    assert statements[0].startswith('DROP INDEX')
+    assert statements[-1].startswith('CREATE')
+
+
+@pytest.mark.parametrize('built', [True, False])
+def test_deferred_indexes_are_rebuilt_only_if_they_were_built(fake, monkeypatch, built):
+    index = HnswVectorIndex(fields=['embedding'], name='item_hnsw', deferred=True)
+    monkeypatch.setattr(Item._meta, 'indexes', [index])
+
+    def responder(sql, params, cursor):
+        if 'user_indexes' in sql:
+            return [('ITEM_HNSW', 'NORMAL', 'embedding', 'ASC')] if built else []
+        if 'user_constraints' in sql:
+            return []
+    fake.responder = responder
+
+    ingest_vectors(Item, 'embedding', numpy.eye(3), defer_indexes=True)
+
+    statements = [sql.split(' ', 2)[:2] for sql in index_statements(fake) if 'user_indexes' not in sql]
+    assert statements == ([['DROP', 'INDEX'], ['CREATE', 'VECTOR']] if built else [])
+
+
+def test_ingest_benchmark_from_a_memory_mapped_file(fake, tmp_path):
+    # End to end load through the backend and the fake driver, run with -s
+    # for the throughput. The server side cost is left out.
+    rows = 200000
+    path = tmp_path / 'embeddings.npy'
+    numpy.save(path, numpy.random.default_rng(0).standard_normal((rows, 3)).astype(numpy.float32))
+    reports = []
+
+    stats = ingest_vectors(
+        Item, 'embedding', str(path), chunk_size=20000,
+        progress=lambda loaded, total, rate: reports.append((loaded, total)),
+    )
+
+    print('\n%(rows)d rows in %(load_time).2f s: %(rows_per_second).0f rows/s' % stats)
+    assert stats['rows'] == rows
+    assert stats['rows_per_second'] > 0
+    assert reports[-1] == (rows, rows) and len(reports) == 10
+    inserts = [params for sql, params, _ in fake.log if sql.startswith('INSERT')]
+    assert [len(params) for params in inserts] == [20000] * 10
@@ -0,0 +1,36 @@
+import io
+
+import fake_dmpython
+from django.db import connection
+from dmDjango import write_lob
+from testapp.models import Document
+
+
+def test_streaming_fields_read_lobs_in_chunks(fake):
+    lob = fake_dmpython.LOB(b'0123456789')
+    fake.responder = lambda sql, params, cursor: [(1, 'body', lob, None)]
+    reads = connection.lob_reads
+
+    document = Document.objects.get()
+    document.data.chunk_size = 4
+
+    assert lob.reads == 0
+    assert list(document.data.chunks()) == [b'0123', b'4567', b'89']
+    assert lob.reads == 3
+    assert connection.lob_reads - reads == 3
+
+
+def test_write_lob_streams_through_the_locator(fake):
+    lob = fake_dmpython.LOB(b'')
+
+    def responder(sql, params, cursor):
+        if 'FOR UPDATE' in sql:
+            return [(lob,)]
+    fake.responder = responder
+
+    written = write_lob(Document(pk=1), 'data', io.BytesIO(b'0123456789'), chunk_size=4)
+
+    assert written == 10
+    assert lob.data == b'0123456789'
+    assert lob.writes == [(1, 4), (5, 4), (9, 2)]
+    assert fake.log[0][0] == 'UPDATE "TESTAPP_DOCUMENT" SET "DATA" = EMPTY_BLOB() WHERE "ID" = ?'
@@ -0,0 +1,23 @@
+import zoneinfo
+
+import pytest
+from django.db import connection
+from django.db.models import Count
+from django.db.models.functions import TruncDay
+from testapp.models import Document
+
+
+def test_time_zone_conversion_is_grouped_by_the_same_text():
+    tz = zoneinfo.ZoneInfo('Asia/Shanghai')
+    queryset = Document.objects.annotate(day=TruncDay('created', tzinfo=tz)).values('day').annotate(n=Count('id'))
+    sql, params = queryset.query.get_compiler(connection=connection).as_sql()
+    conversion = """CAST((FROM_TZ("TESTAPP_DOCUMENT"."CREATED", 'UTC') AT TIME ZONE 'Asia/Shanghai') AS TIMESTAMP)"""
+    # Bound names would make the select list and the GROUP BY differ for
+    # the server, the names are inlined in both.
+    assert sql.count(conversion) == 2
+    assert 'Asia/Shanghai' not in params
+
+
+def test_time_zone_names_are_validated():
+    with pytest.raises(ValueError):
+        connection.ops._convert_sql_to_tz('"CREATED"', (), "UTC') --")
@@ -0,0 +1,141 @@
+import threading
+import time
+
+import pytest
+from django.db import DatabaseError
+
+from conftest import make_connection
+from dmDjango.pool import ConnectionPool, PoolTimeout, pool_stats
+
+
+class Session:
+    def __init__(self):
+        self.closed = False
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+def test_pool_reuses_released_connections():
+    pool = ConnectionPool(Session, max_size=2)
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    assert first.rollbacks == 1
+    assert pool.stats()['created'] == 1
+
+
+def test_pool_times_out_when_exhausted():
+    pool = ConnectionPool(Session, max_size=1, timeout=0)
+    pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    assert pool.stats()['timeouts'] == 1
+
+
+def test_pool_discards_broken_and_expired_connections():
+    pool = ConnectionPool(Session, max_size=2, max_lifetime=0)
+    first = pool.acquire()
+    pool.release(first)
+    assert first.closed
+    second = pool.acquire()
+    assert second is not first
+    assert pool.stats()['discarded'] == 1
+
+
+def test_database_wrappers_share_the_pool():
+    options = {'max_size': 1, 'timeout': 0}
+    first = make_connection(pool=options)
+    second = make_connection(pool=options)
+    first.ensure_connection()
+    session = first.connection
+    with pytest.raises(DatabaseError):
+        second.ensure_connection()
+
+    first.close()
+    assert not session.closed
+    second.ensure_connection()
+    assert second.connection is session
+    assert second.pool_stats()['acquired'] == 2
+    assert second.pool_stats()['name'] == 'SYSDBA@localhost:5236'
+    second.close()
+    second.pool.close()
+
+    # A closed pool is replaced by a new one.
+    third = make_connection(pool=options)
+    third.ensure_connection()
+    assert third.pool is not second.pool
+    third.close()
+    third.pool.close()
+
+
+def test_pool_stats_do_not_expose_the_settings():
+    connection = make_connection(pool={'max_size': 1})
+    connection.ensure_connection()
+    stats = repr(pool_stats())
+    assert 'SYSDBA@localhost:5236' in stats
+    assert "'SYSDBA'" not in stats and 'password' not in stats
+    connection.close()
+    connection.pool.close()
+
+
+def test_pool_is_bounded_under_thread_contention():
+    sizes = []
+
+    class SlowSession(Session):
+        def __init__(self):
+            super().__init__()
+            time.sleep(0.001)
+
+    pool = ConnectionPool(SlowSession, max_size=3, timeout=5)
+
+    def worker():
+        for _ in range(20):
+            session = pool.acquire()
+            sizes.append(pool.stats()['size'])
+            time.sleep(0.001)
+            pool.release(session)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = pool.stats()
+    assert max(sizes) <= 3
+    assert stats['acquired'] == 160
+    assert stats['created'] <= 3
+    assert stats['timeouts'] == 0
+    # 8 threads share 3 sessions: most acquires had to wait.
+    assert stats['wait_time'] > 0
+    assert stats['in_use'] == 0 and stats['idle'] == stats['size']
+
+
+def test_pool_times_out_waiting_threads():
+    pool = ConnectionPool(Session, max_size=1, timeout=0.05)
+    held = pool.acquire()
+    errors = []
+
+    def worker():
+        try:
+            pool.acquire()
+        except PoolTimeout as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pool.release(held)
+
+    assert len(errors) == 4
+    stats = pool.stats()
+    assert stats['timeouts'] == 4
+    assert stats['acquired'] == 1
+    assert stats['size'] == 1
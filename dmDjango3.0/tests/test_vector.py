@@ -0,0 +1,102 @@
+import pytest
+
+from testapp.models import Item
+
+
+def test_knn_batch_groups_hits_per_query(fake):
+    def responder(sql, params, cursor):
+        if 'UNION ALL' in sql:
+            return [(0, 7, 0.5), (0, 3, 0.1), (1, 9, 0.2)]
+        if 'IN' in sql:
+            return [(pk, 'item%d' % pk, 0, None) for pk in sorted(params)]
+    fake.responder = responder
+
+    results = Item.objects.knn_batch('embedding', [[1, 0, 0], [0, 1, 0]], k=2)
+
+    assert [[(obj.pk, distance) for obj, distance in hits] for hits in results] == [
+        [(3, 0.1), (7, 0.5)],
+        [(9, 0.2)],
+    ]
+    union_sql, union_params, _ = fake.log[0]
+    assert union_sql.count('UNION ALL') == 1
+    # The rows are read as (query, pk, distance), check the select list.
+    assert union_sql.startswith('SELECT * FROM (SELECT (0) AS "KNN_QUERY", "TESTAPP_ITEM"."ID" AS "KNN_PK", ')
+    assert list(union_params) == ['[1, 0, 0]', '[0, 1, 0]']
+    # Rows without a vector have no distance and are never hits.
+    assert union_sql.count('"TESTAPP_ITEM"."EMBEDDING" IS NOT NULL') == 2
+    in_bulk_sql, in_bulk_params, _ = fake.log[1]
+    assert sorted(in_bulk_params) == [3, 7, 9]
+
+
+def test_encode_vector_keeps_float32_short():
+    import numpy
+    from dmDjango.vector import decode_vector, encode_vector
+    value = numpy.array([0.1, 0.2, 0.3], dtype=numpy.float32)
+    assert encode_vector(value) == '[0.1,0.2,0.3]'
+    assert encode_vector(numpy.array([1, -2], dtype=numpy.int8)) == '[1, -2]'
+    assert encode_vector([1, 2]) == '[1, 2]'
+    vector = numpy.random.default_rng(0).random(1536).astype(numpy.float32)
+    assert (decode_vector(encode_vector(vector)) == vector).all()
+
+
+def test_decode_vector_returns_float32():
+    import numpy
+    from dmDjango.vector import decode_vector
+    for text in ('[1,2,3]', '[1.0,2.0,3.0]', '[100, 100, -1]'):
+        assert decode_vector(text).dtype == numpy.float32
+    assert (decode_vector('[100, 100, -1]') * 2).tolist() == [200.0, 200.0, -2.0]
+
+
+def test_values_matrix_fills_one_float32_matrix(fake):
+    import numpy
+
+    def responder(sql, params, cursor):
+        if 'COUNT' in sql:
+            return [(2,)]
+        if sql.startswith('SELECT'):
+            return [(1, '[1,2,3]'), (2, '[4, 5, 6]')]
+    fake.responder = responder
+
+    pks, matrix = Item.objects.filter(tenant=1).values_matrix('embedding')
+
+    assert pks.tolist() == [1, 2]
+    assert matrix.dtype == numpy.float32
+    assert matrix.tolist() == [[1, 2, 3], [4, 5, 6]]
+
+
+def test_hybrid_search_selects_candidates_from_a_derived_table(fake):
+    fake.responder = lambda sql, params, cursor: []
+
+    assert Item.objects.filter(tenant=1).hybrid_search(
+        'embedding', [1, 0, 0], k=2, mode='postfilter', max_retries=0,
+    ) == []
+
+    postfilter_sql = fake.log[0][0]
+    assert '"TESTAPP_ITEM"."ID" IN (SELECT * FROM (SELECT "TESTAPP_ITEM"."ID"' in postfilter_sql
+    assert (
+        'ORDER BY COSINE_DISTANCE("TESTAPP_ITEM"."EMBEDDING", (TO_VECTOR(?, 3, FLOAT32))) ASC '
+        'FETCH APPROX FIRST 8 ROWS ONLY))) ORDER BY'
+    ) in postfilter_sql
+    assert list(fake.log[0][1]) == ['[1, 0, 0]', 1, '[1, 0, 0]']
+    # Too few candidates matched: fall back to the exact search.
+    assert 'IN (' not in fake.log[1][0]
+    # Neither the candidates nor the results include rows without a vector.
+    assert postfilter_sql.count('"TESTAPP_ITEM"."EMBEDDING" IS NOT NULL') == 2
+    assert '"TESTAPP_ITEM"."EMBEDDING" IS NOT NULL' in fake.log[1][0]
+
+
+def test_vector_search_rejects_invalid_fetch_clauses():
+    from django.db import NotSupportedError, connection
+    from dmDjango import cosine_distance
+    with pytest.raises(ValueError):
+        Item.objects.vector_search(accuracy=90, ef_search=64)
+    with pytest.raises(ValueError):
+        Item.objects.vector_search(accuracy=90, probes=8)
+    with pytest.raises(ValueError):
+        connection.ops.approximate_fetch_sql(10, accuracy=90, probes=8)
+
+    ranked = Item.objects.order_by(cosine_distance(Item.embedding, [1, 0, 0])).vector_search(ef_search=64)
+    sql, _ = ranked[:10].query.get_compiler(connection=connection).as_sql()
+    assert sql.endswith('FETCH APPROX FIRST 10 ROWS ONLY WITH TARGET ACCURACY PARAMETERS (EFS 64)')
+    with pytest.raises(NotSupportedError):
+        ranked[10:20].query.get_compiler(connection=connection).as_sql()
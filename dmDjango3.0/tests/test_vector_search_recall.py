@@ -0,0 +1,96 @@
+"""
+Recall against latency of approximate vector searches.
+
+recall_vs_latency() runs every query vector once as an exact search and once
+per vector_search() setting, and reports the recall of the approximate
+results and the mean latency of each setting. Pointed at a real database it
+measures the server's vector index; here it runs against an IVF index
+emulated by the fake driver on synthetic data (run with -s for the table).
+"""
+import re
+import time
+
+import numpy
+
+from dmDjango import cosine_distance
+from dmDjango.vector import decode_vector
+from testapp.models import Item
+
+_fetch_re = re.compile(r'FETCH (APPROX )?FIRST (\d+) ROWS ONLY(?:.*PROBES (\d+))?')
+
+
+def recall_vs_latency(queryset, field_name, queries, k, settings):
+    """
+    Return (setting, recall, seconds per query) tuples, the exact search
+    first with a None setting.
+    """
+    ranked = queryset.values_list('pk', flat=True)
+
+    def search(vector, setting):
+        qs = ranked.order_by(cosine_distance(getattr(queryset.model, field_name), vector))
+        if setting is not None:
+            qs = qs.vector_search(**setting)
+        return list(qs[:k])
+
+    results = []
+    exact = []
+    for setting in [None] + list(settings):
+        start = time.perf_counter()
+        hits = [search(vector, setting) for vector in queries]
+        elapsed = (time.perf_counter() - start) / len(queries)
+        if setting is None:
+            exact = hits
+        found = sum(len(set(hit) & set(truth)) for hit, truth in zip(hits, exact))
+        results.append((setting, found / (k * len(queries)), elapsed))
+    return results
+
+
+class FakeIvfIndex:
+    """
+    Answer the nearest neighbour queries of the fake driver over vectors,
+    searching all of them or, for FETCH APPROX, only the rows of the
+    partitions whose centroids are closest to the query.
+    """
+
+    def __init__(self, vectors, partitions, seed=0):
+        rng = numpy.random.default_rng(seed)
+        self.vectors = vectors / numpy.linalg.norm(vectors, axis=1, keepdims=True)
+        self.centroids = self.vectors[rng.choice(len(vectors), partitions, replace=False)]
+        self.partition = numpy.argmax(self.vectors @ self.centroids.T, axis=1)
+
+    def __call__(self, sql, params, cursor):
+        match = _fetch_re.search(sql)
+        if match is None:
+            return None
+        query = decode_vector(params[0])
+        query = query / numpy.linalg.norm(query)
+        rows = numpy.arange(len(self.vectors))
+        if match.group(1):
+            probes = int(match.group(3) or 1)
+            nearest = numpy.argsort(-(self.centroids @ query))[:probes]
+            rows = rows[numpy.isin(self.partition, nearest)]
+        distances = 1 - self.vectors[rows] @ query
+        order = numpy.lexsort((rows, distances))[:int(match.group(2))]
+        return [(int(pk) + 1,) for pk in rows[order]]
+
+
+def test_recall_grows_with_the_probed_partitions(fake):
+    rng = numpy.random.default_rng(42)
+    vectors = rng.standard_normal((5000, 3)).astype(numpy.float32)
+    queries = rng.standard_normal((50, 3)).astype(numpy.float32)
+    fake.responder = FakeIvfIndex(vectors, partitions=16)
+
+    results = recall_vs_latency(
+        Item.objects.all(), 'embedding', queries, k=10,
+        settings=[{'probes': probes} for probes in (1, 2, 4, 16)],
+    )
+
+    print()
+    for setting, recall, seconds in results:
+        print('%-16s recall %.3f  %.3f ms/query' % (setting or 'exact', recall, seconds * 1000))
+    recalls = [recall for _, recall, _ in results]
+    assert recalls[0] == 1.0
+    assert recalls[1] < 1.0
+    assert recalls[1:] == sorted(recalls[1:])
+    # Probing every partition is an exact search.
+    assert recalls[-1] == 1.0
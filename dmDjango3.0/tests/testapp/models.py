@@ -0,0 +1,24 @@
+from django.db import models
+
+from dmDjango import DMManager, HnswVectorIndex, StreamingBinaryField, VectorField
+
+
+class Item(models.Model):
+    name = models.CharField(max_length=50)
+    tenant = models.IntegerField(default=0)
+    embedding = VectorField(dim=3, format='FLOAT32', null=True)
+
+    objects = DMManager()
+
+    class Meta:
+        app_label = 'testapp'
+        indexes = [HnswVectorIndex(fields=['embedding'], name='item_hnsw')]
+
+
+class Document(models.Model):
+    body = models.TextField()
+    data = StreamingBinaryField(null=True)
+    created = models.DateTimeField(null=True)
+
+    class Meta:
+        app_label = 'testapp'